@@ -4,31 +4,21 @@ from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
 from alembic import context
-from decouple import Config, RepositoryEnv
-from dotenv import find_dotenv
-from core.user.models import User
-from core.post.models import Post
-from database import Base
-import os
+from core.documents.models import Document, Chunk
+from database import Base, DB_URL
 
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
-envconfig = Config(RepositoryEnv(".env"))
-app_env = os.getenv("APP_ENV", "dev")
-
-if(app_env == "prod"):
-    env_path = find_dotenv(".env.prod")
-    envconfig = Config(RepositoryEnv(env_path))
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
-# add your model's MetaData object here
-db_url = f"postgresql://{envconfig('DB_USERNAME')}:{envconfig('DB_PASSWORD')}@{envconfig('DB_HOST')}/{envconfig('DB_NAME')}"
+# Same URL the application uses (reads .env / .env.prod via Settings)
+db_url = DB_URL
 # section = config.config_ini_section
 # config.set_section_option(section, "DB_USERNAME", envconfig("DB_USERNAME"))
 # config.set_section_option(section, "DB_PASSWORD", envconfig("DB_PASSWORD"))
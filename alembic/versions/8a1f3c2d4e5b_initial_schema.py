@@ -0,0 +1,57 @@
+"""initial schema
+
+Revision ID: 8a1f3c2d4e5b
+Revises: 
+Create Date: 2026-10-15 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a1f3c2d4e5b'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Databases created before migrations existed already have these tables
+    # (they were created with Base.metadata.create_all), so only create
+    # what is missing.
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table('documents'):
+        op.create_table(
+            'documents',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('filename', sa.String(), nullable=True),
+            sa.Column('content', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_documents_id'), 'documents', ['id'], unique=False)
+
+    if not inspector.has_table('chunks'):
+        op.create_table(
+            'chunks',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('document_id', sa.Integer(), nullable=True),
+            sa.Column('text', sa.Text(), nullable=True),
+            sa.Column('embedding', sa.Text(), nullable=True),
+            sa.ForeignKeyConstraint(['document_id'], ['documents.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_chunks_id'), 'chunks', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_chunks_id'), table_name='chunks')
+    op.drop_table('chunks')
+    op.drop_index(op.f('ix_documents_id'), table_name='documents')
+    op.drop_table('documents')
@@ -0,0 +1,33 @@
+"""add document embedding status
+
+Revision ID: b7e2d9f1a3c6
+Revises: 8a1f3c2d4e5b
+Create Date: 2026-10-15 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2d9f1a3c6'
+down_revision: Union[str, None] = '8a1f3c2d4e5b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing documents were embedded synchronously during upload
+    op.add_column(
+        'documents',
+        sa.Column('embedding_status', sa.String(), nullable=False, server_default='completed')
+    )
+    op.alter_column('documents', 'embedding_status', server_default=None)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('documents', 'embedding_status')
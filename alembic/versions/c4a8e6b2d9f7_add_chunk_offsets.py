@@ -0,0 +1,30 @@
+"""add chunk offsets
+
+Revision ID: c4a8e6b2d9f7
+Revises: b7e2d9f1a3c6
+Create Date: 2026-10-15 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a8e6b2d9f7'
+down_revision: Union[str, None] = 'b7e2d9f1a3c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('chunks', sa.Column('start_offset', sa.Integer(), nullable=True))
+    op.add_column('chunks', sa.Column('end_offset', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('chunks', 'end_offset')
+    op.drop_column('chunks', 'start_offset')
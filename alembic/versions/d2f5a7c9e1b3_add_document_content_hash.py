@@ -0,0 +1,32 @@
+"""add document content hash and embedding queue time
+
+Revision ID: d2f5a7c9e1b3
+Revises: c4a8e6b2d9f7
+Create Date: 2026-10-15 11:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f5a7c9e1b3'
+down_revision: Union[str, None] = 'c4a8e6b2d9f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_documents_content_hash'), 'documents', ['content_hash'], unique=True)
+    op.add_column('documents', sa.Column('embedding_queued_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('documents', 'embedding_queued_at')
+    op.drop_index(op.f('ix_documents_content_hash'), table_name='documents')
+    op.drop_column('documents', 'content_hash')
@@ -0,0 +1,29 @@
+"""drop chunk embedding
+
+Revision ID: e9b1c3d5f7a2
+Revises: d2f5a7c9e1b3
+Create Date: 2026-10-15 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9b1c3d5f7a2'
+down_revision: Union[str, None] = 'd2f5a7c9e1b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Embeddings are stored in the vector store only
+    op.drop_column('chunks', 'embedding')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('chunks', sa.Column('embedding', sa.Text(), nullable=True))
@@ -0,0 +1,28 @@
+"""add chunk document_id index
+
+Revision ID: f3c6e8a1b4d9
+Revises: e9b1c3d5f7a2
+Create Date: 2026-10-15 12:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c6e8a1b4d9'
+down_revision: Union[str, None] = 'e9b1c3d5f7a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_chunks_document_id'), 'chunks', ['document_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_chunks_document_id'), table_name='chunks')
@@ -1,9 +1,27 @@
+from contextlib import asynccontextmanager
+from pathlib import Path
+
 import uvicorn
 from fastapi import FastAPI
-from database import Base, engine
 
+from config import get_settings
 from core.documents.routes import documents_router
+from core.http import close_http_clients
 from core.rag.routes import rag_router
+from core.vector.service import close_vector_services
+
+settings = get_settings()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create storage directories once at startup instead of on every upload
+    Path(settings.UPLOAD_DIR).mkdir(parents=True, exist_ok=True)
+    Path(settings.DATA_ROOT).mkdir(parents=True, exist_ok=True)
+    yield
+    # Save vector data still buffered in memory
+    close_vector_services()
+    await close_http_clients()
 
 
 app = FastAPI(
@@ -13,6 +31,7 @@ app = FastAPI(
     docs_url="/docs",  # Swagger UI - Interactive API documentation
     redoc_url="/redoc",  # ReDoc - Alternative API documentation
     openapi_url="/openapi.json",  # OpenAPI schema JSON
+    lifespan=lifespan,
 )
 
 api = '/api/v1'
@@ -20,7 +39,5 @@ api = '/api/v1'
 app.include_router(documents_router, prefix=f'{api}/documents', tags=['documents'])
 app.include_router(rag_router, prefix=f'{api}/rag', tags=['rag'])
 
-Base.metadata.create_all(bind=engine)
-
 if __name__ == "__main__":
     uvicorn.run('app:app', host='0.0.0.0', port=8080, reload=True)
\ No newline at end of file
@@ -27,7 +27,19 @@ class Settings(BaseSettings):
     OPENAI_MODEL:str = "gpt-4o-mini"
     OPENAI_EMBEDDING_MODEL:str = "text-embedding-3-small"
     CHROMA_COLLECTION_NAME:str = "documents"
+    EMBEDDING_RETRY_AFTER:int = 900  # Segundos tras los que un documento aún pendiente de embeddings se vuelve a encolar al subirlo de nuevo
+    VECTOR_BACKEND:str = "chroma"  # Almacén de vectores: "chroma" o "faiss" (requiere faiss-cpu)
+    FAISS_INDEX_PATH:str = "data/faiss_index"  # Carpeta donde se guarda el índice FAISS
+    FAISS_FLUSH_INTERVAL:int = 5  # Segundos entre guardados del índice FAISS en disco
+    FAISS_FLUSH_EVERY:int = 1000  # Cambios que fuerzan un guardado anticipado del índice FAISS
+    EMBED_BATCH_SIZE:int = 256  # Textos enviados por petición de embeddings (máximo 2048)
+    EMBED_CONCURRENCY:int = 5  # Peticiones de embeddings simultáneas al indexar un documento
     RAG_N_RESULTS:int = 5  # Número de chunks similares a recuperar en búsqueda RAG
+    RAG_CACHE_MAXSIZE:int = 1024  # Respuestas RAG guardadas en caché (0 desactiva la caché)
+    RAG_CACHE_TTL:int = 300  # Segundos que una respuesta RAG permanece en caché
+    RAG_SEMANTIC_CACHE_SIZE:int = 1000  # Consultas guardadas en la caché semántica (0 la desactiva)
+    RAG_CACHE_THRESHOLD:float = 0.97  # Similitud coseno mínima para reutilizar una respuesta
+    RAG_NO_RESULTS_MESSAGE:str = "No relevant information was found in the documents to answer this question."  # Respuesta cuando no se encuentran chunks (no se llama al LLM)
     model_config = SettingsConfigDict(env_file=get_app_env())
         
 @lru_cache()        
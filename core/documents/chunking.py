@@ -0,0 +1,77 @@
+"""
+Text chunking for document ingestion.
+Splits text into overlapping chunks that end on natural boundaries
+(paragraphs, lines, sentences or words) instead of a fixed character stride.
+"""
+
+from typing import List, Sequence, Tuple
+
+CHUNK_SIZE = 500  # Target maximum characters per chunk
+CHUNK_OVERLAP = 80  # Characters shared between consecutive chunks
+SEPARATORS = ("\n\n", "\n", ". ", " ")  # Preferred break points, in order
+
+
+def split_text(
+    text: str,
+    chunk_size: int = CHUNK_SIZE,
+    chunk_overlap: int = CHUNK_OVERLAP,
+    separators: Sequence[str] = SEPARATORS
+) -> List[Tuple[int, int]]:
+    """
+    Splits text into overlapping chunks.
+    Each chunk ends at the last separator found within chunk_size characters,
+    trying separators in order; text without any separator is cut at chunk_size.
+    
+    Args:
+        text: Text to split
+        chunk_size: Maximum number of characters per chunk
+        chunk_overlap: Number of characters repeated at the start of the next chunk
+        separators: Break points to look for, from most to least preferred
+        
+    Returns:
+        List of (start, end) character offsets of each chunk in text
+    """
+    if chunk_overlap >= chunk_size // 2:
+        raise ValueError("chunk_overlap must be less than half of chunk_size")
+    
+    spans = []
+    length = len(text)
+    start = 0
+    
+    while start < length:
+        end = min(start + chunk_size, length)
+        if end < length:
+            end = _find_break(text, start + chunk_size // 2, end, separators)
+        
+        if text[start:end].strip():
+            spans.append((start, end))
+        
+        if end >= length:
+            break
+        
+        # Start the next chunk chunk_overlap characters back, on a word boundary
+        next_start = end - chunk_overlap
+        space = text.find(" ", next_start, end)
+        start = space + 1 if space != -1 else next_start
+    
+    return spans
+
+
+def _find_break(text: str, lower: int, upper: int, separators: Sequence[str]) -> int:
+    """
+    Finds where a chunk should end between lower and upper.
+    
+    Args:
+        text: Text being split
+        lower: Smallest acceptable end offset
+        upper: Largest acceptable end offset
+        separators: Break points to look for, from most to least preferred
+        
+    Returns:
+        End offset just after the preferred separator, or upper if none is found
+    """
+    for separator in separators:
+        position = text.rfind(separator, lower, upper)
+        if position != -1:
+            return position + len(separator)
+    return upper
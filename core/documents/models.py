@@ -6,13 +6,21 @@ from sqlalchemy.sql import func
 import uuid
 from database import Base
 
+# Values of Document.embedding_status
+EMBEDDING_PENDING = "pending"
+EMBEDDING_COMPLETED = "completed"
+EMBEDDING_FAILED = "failed"
+
 class Document(Base):
     __tablename__ = "documents"
 
     id = Column(Integer, primary_key=True, index=True)
     filename = Column(String)
     content = Column(Text)
+    content_hash = Column(String(64), unique=True, index=True)  # SHA-256 of the uploaded file
     created_at = Column(DateTime, default=datetime.datetime.now(datetime.UTC))
+    embedding_status = Column(String, nullable=False, default=EMBEDDING_PENDING)
+    embedding_queued_at = Column(DateTime)  # When embedding was last scheduled
 
     chunks = relationship("Chunk", back_populates="document")
 
@@ -21,8 +29,9 @@ class Chunk(Base):
     __tablename__ = "chunks"
 
     id = Column(Integer, primary_key=True, index=True)
-    document_id = Column(Integer, ForeignKey("documents.id"))
+    document_id = Column(Integer, ForeignKey("documents.id"), index=True)
     text = Column(Text)
-    embedding = Column(Text)  # JSON list of floats (string almacenada)
+    start_offset = Column(Integer)  # Position of the chunk in Document.content
+    end_offset = Column(Integer)
 
     document = relationship("Document", back_populates="chunks")
\ No newline at end of file
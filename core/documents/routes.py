@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, UploadFile
+from fastapi import APIRouter, BackgroundTasks, Depends, UploadFile
 from fastapi.responses import JSONResponse
 from core.documents.services import DocumentService
 from core.utils import validate_document_file
@@ -7,15 +7,19 @@ from fastapi.encoders import jsonable_encoder
 
 documents_router = APIRouter()
 
-@documents_router.post("/upload")
+@documents_router.post("/upload", status_code=202)
 async def upload_document(
+    background_tasks: BackgroundTasks,
     file: UploadFile = Depends(validate_document_file),
     document_service: DocumentService = Depends(get_document_service)
 ) -> JSONResponse:
     """
     Endpoint to upload a .txt or .pdf file.
     File extension validation is done via the validate_document_file dependency.
+    Embeddings are generated in the background, so the response is 202 Accepted.
+    Re-uploading a file with the same content returns the existing document (200 OK).
     """
     # Use service to process the document
-    result = await document_service.upload_document(file)
-    return JSONResponse(status_code=201, content=jsonable_encoder(result))
\ No newline at end of file
+    result = await document_service.upload_document(file, background_tasks)
+    status_code = 200 if result["duplicate"] else 202
+    return JSONResponse(status_code=status_code, content=jsonable_encoder(result))
\ No newline at end of file
@@ -1,19 +1,63 @@
 import datetime
+import hashlib
 import os
+import re
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from io import BytesIO
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, Optional
 
-from fastapi import UploadFile, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy.exc import SQLAlchemyError
+import aiofiles
+import anyio
+from fastapi import BackgroundTasks, UploadFile, HTTPException
+from sqlalchemy import and_, func, insert, or_
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from pypdf import PdfReader
 
-from core.documents.models import Document, Chunk
+from core.documents.chunking import split_text
+from core.documents.models import (
+    Document,
+    Chunk,
+    EMBEDDING_COMPLETED,
+    EMBEDDING_FAILED,
+    EMBEDDING_PENDING,
+)
+from core.rag.cache import clear_caches
 from core.vector.service import get_vector_service
+from database import sessionLocal
 from config import get_settings
 
 settings = get_settings()
-CHUNK_SIZE = 500
+UPLOAD_DIR = Path(settings.UPLOAD_DIR)
+COLLECTION_NAME = settings.CHROMA_COLLECTION_NAME
+# I/O buffer size shared by upload writes and text reads. 64 KiB keeps the
+# number of syscalls low without holding large blocks in memory.
+IO_BUF = 65536
+# Seconds after which a document still pending embedding is assumed lost
+# (e.g. the process stopped before the task ran) and re-uploading it retries
+EMBEDDING_RETRY_AFTER = settings.EMBEDDING_RETRY_AFTER
+PDF_MAX_WORKERS = 8  # Threads used to extract PDF pages in parallel
+PDF_READ_BUF = 1 << 20  # PDFs are read into memory once, in 1 MiB reads
+
+# Text-showing operators (Tj, TJ, ', ") and XObject draws (Do) in a content stream.
+# ' and " only count as operators right after a string operand, (...) or <...>,
+# and before whitespace, so quote bytes inside data (e.g. inline images) don't match
+_TEXT_OP_RE = re.compile(rb"\bT[jJ]\b|[)>]\s*['\"](?=\s|$)|\bDo\b")
+
+
+class _UploadedFile:
+    """Path of a file being uploaded and whether it should be kept."""
+    
+    def __init__(self):
+        self.path: Optional[str] = None
+        self.committed = False
+    
+    def commit(self) -> None:
+        self.committed = True
 
 
 class DocumentService:
@@ -21,13 +65,19 @@ class DocumentService:
     def __init__(self, db: Session = None):
         self.db = db if db else None
         
-    async def upload_document(self, file: UploadFile) -> Dict[str, Any]:
+    async def upload_document(self, file: UploadFile, background_tasks: BackgroundTasks) -> Dict[str, Any]:
         """
         Uploads a document and processes the file.
         Saves the file, extracts text, creates database record and generates chunks.
+        Embeddings are generated in a background task after the response is sent.
+        If a document with the same content was already uploaded, its record is
+        returned instead and nothing is processed again, unless its embedding
+        failed or has been pending for longer than EMBEDDING_RETRY_AFTER, in
+        which case embedding is retried.
         
         Args:
             file: The file to upload
+            background_tasks: Request background tasks used to schedule embedding
             
         Returns:
             Dict with information about the processed document
@@ -35,97 +85,241 @@ class DocumentService:
         Raises:
             HTTPException: If an error occurs during the process
         """
-        file_location = None
         try:
-            # Ensure upload directory exists
-            self._ensure_upload_directory_exists()
-            
-            # Save file to disk
-            file_location = await self._save_file(file)
-            
-            # Extract text from file
-            text = self._extract_text_from_file(file_location)
+            with self._uploaded_file() as upload:
+                # Save file to disk under a temporary name that keeps the extension
+                file_extension = Path(file.filename).suffix.lower()
+                upload.path = str(UPLOAD_DIR / f".{uuid.uuid4().hex}.part{file_extension}")
+                content_hash = await self._save_file(file, upload.path)
+                
+                # Skip processing if the same content was already uploaded
+                # (the temporary file is removed on exit)
+                existing = self._get_document_by_hash(content_hash)
+                if existing:
+                    return self._handle_duplicate(existing, background_tasks)
+                
+                # Extract text from file
+                text = await self._extract_text_from_file(upload.path)
+                
+                # Create database record and chunks in a transaction
+                try:
+                    document, chunks_data = self._create_document_with_chunks(file.filename, text, content_hash)
+                except IntegrityError:
+                    # An upload of the same content committed first
+                    existing = self._get_document_by_hash(content_hash)
+                    if existing is None:
+                        raise
+                    return self._handle_duplicate(existing, background_tasks)
+                
+                # Move file to its final location only once the document exists,
+                # so a failed upload never replaces or removes another one's file.
+                # If the move fails, the document is removed so it can be uploaded again.
+                final_location = str(UPLOAD_DIR / file.filename)
+                try:
+                    os.replace(upload.path, final_location)
+                except OSError:
+                    self._delete_document(document.id)
+                    raise
+                upload.path = final_location
+                
+                # Keep the file from now on
+                upload.commit()
             
-            # Create database record and chunks in a transaction
-            document, chunks_count = self._create_document_with_chunks(file.filename, text)
+            # Generate embeddings once the response has been sent
+            background_tasks.add_task(self.embed_document, document.id, chunks_data)
             
             # Return processed document information
             return {
                 "message": f"Document '{file.filename}' uploaded successfully",
                 "document_id": document.id,
                 "filename": document.filename,
-                "chunks": chunks_count
+                "chunks": len(chunks_data),
+                "embedding_status": document.embedding_status,
+                "duplicate": False
             }
             
         except HTTPException:
             # Re-raise HTTPException without modification
             raise
         except (OSError, IOError) as e:
-            # Clean up file if it exists and there was an I/O error
-            if file_location and os.path.exists(file_location):
-                try:
-                    os.remove(file_location)
-                except OSError:
-                    pass  # Ignore cleanup errors
-            
             self._handle_exception(e, f"Error saving or reading file: {str(e)}")
         except ValueError as e:
-            # Clean up file if it exists and there was a validation error
-            if file_location and os.path.exists(file_location):
-                try:
-                    os.remove(file_location)
-                except OSError:
-                    pass
-            
             raise HTTPException(status_code=400, detail=str(e))
         except SQLAlchemyError as e:
-            # Clean up file if it exists and there was a database error
-            if file_location and os.path.exists(file_location):
-                try:
-                    os.remove(file_location)
-                except OSError:
-                    pass
-            
             self._handle_database_exception(e, "Error saving document to database")
         except Exception as e:
-            # Clean up file if it exists and there was an unexpected error
-            if file_location and os.path.exists(file_location):
-                try:
-                    os.remove(file_location)
-                except OSError:
-                    pass
-            
             self._handle_exception(e, f"Unexpected error processing document: {str(e)}")
     
-    def _ensure_upload_directory_exists(self) -> None:
-        """Ensures the upload directory exists, creates it if it doesn't."""
-        upload_dir = Path(settings.UPLOAD_DIR)
-        upload_dir.mkdir(parents=True, exist_ok=True)
+    @contextmanager
+    def _uploaded_file(self) -> Iterator[_UploadedFile]:
+        """
+        Removes the uploaded file on exit unless commit() was called,
+        whether processing failed or was skipped.
+        
+        Yields:
+            _UploadedFile in which to record the path of the file
+        """
+        upload = _UploadedFile()
+        try:
+            yield upload
+        finally:
+            if upload.path and not upload.committed:
+                try:
+                    os.unlink(upload.path)
+                except OSError:
+                    pass  # Ignore cleanup errors (e.g. file never created)
     
-    async def _save_file(self, file: UploadFile) -> str:
+    async def _save_file(self, file: UploadFile, file_location: str) -> str:
         """
-        Saves the file to the upload directory.
+        Saves the file to the given path.
+        The upload is streamed to disk in IO_BUF-sized chunks, so memory use
+        stays constant regardless of file size, and hashed on the way.
         
         Args:
             file: The file to save
+            file_location: Path to write the file to
             
         Returns:
-            Full path of the saved file
+            SHA-256 hex digest of the file content
         """
-        file_location = os.path.join(settings.UPLOAD_DIR, file.filename)
+        content_hash = hashlib.sha256()
         
         # Reset file pointer in case it was already read
         await file.seek(0)
-        content = await file.read()
         
-        with open(file_location, "wb") as f:
-            f.write(content)
+        async with aiofiles.open(file_location, "wb", buffering=IO_BUF) as f:
+            while chunk := await file.read(IO_BUF):
+                content_hash.update(chunk)
+                await f.write(chunk)
+        
+        return content_hash.hexdigest()
+    
+    def _get_document_by_hash(self, content_hash: str) -> Optional[Document]:
+        """
+        Finds a document by the SHA-256 hash of its file content.
+        Only the columns needed for the upload response are loaded, not the full text.
+        
+        Args:
+            content_hash: SHA-256 hex digest
+            
+        Returns:
+            Matching Document, or None
+        """
+        return (
+            self.db.query(Document)
+            .options(load_only(Document.id, Document.filename, Document.embedding_status))
+            .filter(Document.content_hash == content_hash)
+            .first()
+        )
+    
+    def _handle_duplicate(self, document: Document, background_tasks: BackgroundTasks) -> Dict[str, Any]:
+        """
+        Handles the upload of a file that was already uploaded.
+        If embedding the existing document failed, or is still pending after
+        EMBEDDING_RETRY_AFTER seconds, it is scheduled again from its stored
+        chunks, so re-uploading the file makes it searchable.
+        
+        Args:
+            document: Existing document with the same content
+            background_tasks: Request background tasks used to schedule embedding
+            
+        Returns:
+            Dict with information about the existing document
+        """
+        if document.embedding_status != EMBEDDING_COMPLETED and self._mark_embedding_pending(document.id):
+            document.embedding_status = EMBEDDING_PENDING
+            chunks_data = self._get_chunks_data(document.id)
+            background_tasks.add_task(self.embed_document, document.id, chunks_data)
+        
+        return self._build_duplicate_response(document)
+    
+    def _mark_embedding_pending(self, document_id: int) -> bool:
+        """
+        Moves a document whose embedding failed or was lost back to pending.
+        Only one of several concurrent re-uploads wins, so embedding is
+        scheduled once.
+        
+        Args:
+            document_id: Document ID
+            
+        Returns:
+            True if the status was changed by this call
+        """
+        now = datetime.datetime.now(datetime.timezone.utc)
+        lost_before = now - datetime.timedelta(seconds=EMBEDDING_RETRY_AFTER)
+        updated = self.db.query(Document).filter(
+            Document.id == document_id,
+            or_(
+                Document.embedding_status == EMBEDDING_FAILED,
+                and_(
+                    Document.embedding_status == EMBEDDING_PENDING,
+                    or_(
+                        Document.embedding_queued_at.is_(None),
+                        Document.embedding_queued_at < lost_before
+                    )
+                )
+            )
+        ).update(
+            {Document.embedding_status: EMBEDDING_PENDING, Document.embedding_queued_at: now},
+            synchronize_session=False
+        )
+        self.db.commit()
+        return updated == 1
+    
+    def _delete_document(self, document_id: int) -> None:
+        """
+        Deletes a document and its chunks.
+        
+        Args:
+            document_id: Document ID
+        """
+        self.db.query(Chunk).filter(Chunk.document_id == document_id).delete(synchronize_session=False)
+        self.db.query(Document).filter(Document.id == document_id).delete(synchronize_session=False)
+        self.db.commit()
+    
+    def _get_chunks_data(self, document_id: int) -> list[Dict[str, Any]]:
+        """
+        Loads the stored chunks of a document in the format used for embedding.
+        
+        Args:
+            document_id: Document ID
+            
+        Returns:
+            List of dicts with 'id' and 'text' for each chunk
+        """
+        rows = self.db.query(Chunk.id, Chunk.text).filter(
+            Chunk.document_id == document_id
+        ).order_by(Chunk.id).all()
+        return [{"id": chunk_id, "text": text} for chunk_id, text in rows]
+    
+    def _build_duplicate_response(self, document: Document) -> Dict[str, Any]:
+        """
+        Builds the upload response for a file that was already uploaded.
+        
+        Args:
+            document: Existing document with the same content
+            
+        Returns:
+            Dict with information about the existing document
+        """
+        chunks_count = self.db.query(func.count(Chunk.id)).filter(
+            Chunk.document_id == document.id
+        ).scalar()
         
-        return file_location
+        return {
+            "message": f"Document '{document.filename}' was already uploaded",
+            "document_id": document.id,
+            "filename": document.filename,
+            "chunks": chunks_count,
+            "embedding_status": document.embedding_status,
+            "duplicate": True
+        }
     
-    def _extract_text_from_file(self, file_location: str) -> str:
+    async def _extract_text_from_file(self, file_location: str) -> str:
         """
         Extracts text from file according to its type.
+        Parsing is blocking, so it runs in a worker thread to keep the
+        event loop free for other requests.
         
         Args:
             file_location: File path
@@ -137,22 +331,35 @@ class DocumentService:
             ValueError: If file type is not supported
             HTTPException: If PDF extraction fails
         """
-        if file_location.endswith(".txt"):
-            try:
-                with open(file_location, "r", encoding="utf-8") as f:
-                    return f.read()
-            except UnicodeDecodeError:
-                # Try latin-1 if utf-8 fails
-                with open(file_location, "r", encoding="latin-1") as f:
-                    return f.read()
-        elif file_location.endswith(".pdf"):
-            return self._extract_text_from_pdf(file_location)
-        else:
-            raise ValueError(f"Unsupported file type: {os.path.splitext(file_location)[1]}")
+        file_extension = Path(file_location).suffix.lower()
+        extractor = self._EXTRACTORS.get(file_extension)
+        if extractor is None:
+            raise ValueError(f"Unsupported file type: {file_extension}")
+        
+        return await anyio.to_thread.run_sync(extractor, self, file_location)
+    
+    def _extract_txt_sync(self, file_location: str) -> str:
+        """
+        Reads a text file, falling back to latin-1 if it is not valid UTF-8.
+        
+        Args:
+            file_location: Path to the text file
+            
+        Returns:
+            File contents
+        """
+        try:
+            with open(file_location, "r", encoding="utf-8", buffering=IO_BUF) as f:
+                return f.read()
+        except UnicodeDecodeError:
+            # Try latin-1 if utf-8 fails
+            with open(file_location, "r", encoding="latin-1", buffering=IO_BUF) as f:
+                return f.read()
     
-    def _extract_text_from_pdf(self, file_location: str) -> str:
+    def _extract_pdf_sync(self, file_location: str) -> str:
         """
         Extracts text from a PDF file.
+        Pages are extracted in parallel by a thread pool and joined in page order.
         
         Args:
             file_location: Path to the PDF file
@@ -164,19 +371,26 @@ class DocumentService:
             HTTPException: If PDF extraction fails
         """
         try:
-            reader = PdfReader(file_location)
-            text_parts = []
+            with open(file_location, "rb", buffering=PDF_READ_BUF) as f:
+                pdf_data = f.read()
+            page_count = len(PdfReader(BytesIO(pdf_data)).pages)
             
-            # Extract text from each page
-            for page_num, page in enumerate(reader.pages, 1):
-                try:
-                    page_text = page.extract_text()
-                    if page_text.strip():  # Only add non-empty pages
-                        text_parts.append(page_text)
-                except Exception as e:
-                    # Log warning but continue with other pages
-                    print(f"Warning: Could not extract text from page {page_num}: {str(e)}")
-                    continue
+            # PdfReader is not thread-safe, so each worker keeps its own
+            # reader over the shared bytes and reuses it for all its pages
+            worker_state = threading.local()
+            
+            def extract_page(page_index: int) -> str:
+                reader = getattr(worker_state, "reader", None)
+                if reader is None:
+                    reader = worker_state.reader = PdfReader(BytesIO(pdf_data))
+                return self._extract_pdf_page(reader, page_index)
+            
+            max_workers = max(1, min(PDF_MAX_WORKERS, page_count))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                page_texts = list(executor.map(extract_page, range(page_count)))
+            
+            # Only keep non-empty pages
+            text_parts = [page_text for page_text in page_texts if page_text.strip()]
             
             if not text_parts:
                 raise HTTPException(
@@ -203,85 +417,171 @@ class DocumentService:
                 detail=f"Error extracting text from PDF: {str(e)}"
             )
     
-    def _create_document_with_chunks(self, filename: str, text: str) -> tuple[Document, int]:
+    # Text extractor for each supported file extension
+    _EXTRACTORS = {
+        ".txt": _extract_txt_sync,
+        ".pdf": _extract_pdf_sync,
+    }
+    
+    def _extract_pdf_page(self, reader: PdfReader, page_index: int) -> str:
+        """
+        Extracts text from a single PDF page.
+        
+        Args:
+            reader: Reader of the PDF file
+            page_index: Zero-based page index
+            
+        Returns:
+            Page text, or an empty string if extraction fails
+        """
+        try:
+            page = reader.pages[page_index]
+            if not self._page_may_contain_text(page):
+                return ""
+            return page.extract_text() or ""
+        except Exception as e:
+            # Log warning but continue with other pages
+            print(f"Warning: Could not extract text from page {page_index + 1}: {str(e)}")
+            return ""
+    
+    def _page_may_contain_text(self, page) -> bool:
+        """
+        Cheap check on the raw content stream of a page before running the
+        text extractor. Pages made only of drawing operations (charts, vector
+        graphics) can have multi-MB streams that produce no text at all.
+        
+        Args:
+            page: PDF page
+            
+        Returns:
+            False if the page has no text-showing operators (Tj, TJ, ', ")
+            and no XObjects (Do) that could contain text, True otherwise
+        """
+        contents = page.get_contents()
+        if contents is None:
+            return False
+        return _TEXT_OP_RE.search(contents.get_data()) is not None
+    
+    def _create_document_with_chunks(self, filename: str, text: str, content_hash: str) -> tuple[Document, list[Dict[str, Any]]]:
         """
         Creates the document and its chunks in a transaction.
-        Also generates and saves embeddings in ChromaDB.
         
         Args:
             filename: File name
             text: Text content
+            content_hash: SHA-256 hex digest of the file content
             
         Returns:
-            Tuple with (Document, number of chunks created)
+            Tuple with (Document, list of dicts with 'id' and 'text' of each chunk)
         """
         try:
             # Create document
+            now = datetime.datetime.now(datetime.timezone.utc)
             document = Document(
                 filename=filename,
                 content=text,
-                created_at=datetime.datetime.now(datetime.timezone.utc)
+                content_hash=content_hash,
+                created_at=now,
+                embedding_queued_at=now
             )
             self.db.add(document)
             self.db.flush()  # To get ID without committing
             
-            # Create chunks
-            chunks = []
-            for i in range(0, len(text), CHUNK_SIZE):
-                chunk_text = text[i:i + CHUNK_SIZE]
-                chunk = Chunk(
-                    document_id=document.id,
-                    text=chunk_text
-                )
-                self.db.add(chunk)
-                chunks.append(chunk)
+            # Create chunks with a single multi-row INSERT ... RETURNING id
+            rows = [
+                {
+                    "document_id": document.id,
+                    "text": text[start:end],
+                    "start_offset": start,
+                    "end_offset": end
+                }
+                for start, end in split_text(text)
+            ]
+            chunk_ids = []
+            if rows:
+                chunk_ids = self.db.execute(
+                    insert(Chunk).returning(Chunk.id, sort_by_parameter_order=True),
+                    rows
+                ).scalars().all()
+            
+            # Prepare data for ChromaDB
+            chunks_data = [
+                {
+                    "id": chunk_id,
+                    "text": row["text"]
+                }
+                for chunk_id, row in zip(chunk_ids, rows)
+            ]
             
             # Commit entire transaction
             self.db.commit()
-            self.db.refresh(document)
-            
-            # Generate and save embeddings in ChromaDB (after commit)
-            try:
-                self._save_chunks_embeddings(chunks, document.id)
-            except Exception as e:
-                self._handle_exception(e, f"Error saving embeddings to ChromaDB: {str(e)}")
-                self.db.rollback()
             
-            return document, len(chunks)
+            return document, chunks_data
             
         except SQLAlchemyError:
             # Rollback on error
             self.db.rollback()
             raise
     
-    def _save_chunks_embeddings(self, chunks: list[Chunk], document_id: int) -> None:
+    async def embed_document(self, document_id: int, chunks_data: list[Dict[str, Any]]) -> None:
         """
-        Saves chunk embeddings to ChromaDB.
+        Generates and saves the embeddings of a document's chunks, then records
+        the outcome in Document.embedding_status.
+        Runs as a background task, after the request session has been closed.
         
         Args:
-            chunks: List of Chunk objects
             document_id: Document ID
+            chunks_data: List of dicts with 'id' and 'text' for each chunk
         """
         try:
-            # Prepare data for ChromaDB
-            chunks_data = [
-                {
-                    "id": chunk.id,
-                    "text": chunk.text
-                }
-                for chunk in chunks
-            ]
+            await self._save_chunks_embeddings(chunks_data, document_id)
+            status = EMBEDDING_COMPLETED
             
+            # Cached RAG responses don't take the new document into account
+            clear_caches()
+        except Exception:
+            status = EMBEDDING_FAILED
+        
+        await anyio.to_thread.run_sync(self._set_embedding_status, document_id, status)
+    
+    async def _save_chunks_embeddings(self, chunks_data: list[Dict[str, Any]], document_id: int) -> None:
+        """
+        Saves chunk embeddings to ChromaDB.
+        
+        Args:
+            chunks_data: List of dicts with 'id' and 'text' for each chunk
+            document_id: Document ID
+        """
+        try:
             # Get vector service and save embeddings
-            collection_name = settings.CHROMA_COLLECTION_NAME
-            vector_service = get_vector_service(collection_name=collection_name)
-            vector_service.add_chunks(chunks_data, document_id)
+            vector_service = get_vector_service(collection_name=COLLECTION_NAME)
+            await vector_service.add_chunks_async(chunks_data, document_id)
             
         except Exception as e:
             # Log error but don't fail main operation
             print(f"Error saving embeddings: {str(e)}")
             raise
     
+    def _set_embedding_status(self, document_id: int, status: str) -> None:
+        """
+        Updates the embedding status of a document using its own session.
+        
+        Args:
+            document_id: Document ID
+            status: New embedding status
+        """
+        db = sessionLocal()
+        try:
+            db.query(Document).filter(Document.id == document_id).update(
+                {Document.embedding_status: status}
+            )
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            print(f"Error updating embedding status of document {document_id}: {str(e)}")
+        finally:
+            db.close()
+    
     def _handle_database_exception(self, exception: Exception, message: str) -> None:
         """
         Handles database exceptions.
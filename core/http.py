@@ -0,0 +1,26 @@
+"""
+HTTP client shared by every outgoing API client (OpenAI embeddings and LLM).
+A single pool keeps connections warm, and HTTP/2 lets concurrent requests to
+the same host share one connection instead of opening one TLS session each.
+"""
+
+import httpx
+
+HTTP_MAX_CONNECTIONS = 64
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 32
+HTTP_TIMEOUT = 30.0  # Seconds per connect/read/write operation
+
+# Used by the AsyncOpenAI clients, from the event loop
+shared_async_http = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS
+    ),
+    timeout=HTTP_TIMEOUT
+)
+
+
+async def close_http_clients() -> None:
+    """Closes the shared HTTP client and its connections. Called on shutdown."""
+    await shared_async_http.aclose()
@@ -1,6 +1,9 @@
-from openai import OpenAI
+from typing import AsyncIterator
+
+from openai import AsyncOpenAI
 from fastapi import HTTPException
 from config import get_settings
+from core.http import shared_async_http
 
 settings = get_settings()
 
@@ -12,12 +15,17 @@ class LLMService:
     """
     
     def __init__(self):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        self.async_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, http_client=shared_async_http)
         self.model = settings.OPENAI_MODEL
     
-    def generate_response(self, prompt: str, temperature: float = 0.7, max_tokens: int = 1000) -> str:
+    async def generate_response_async(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 1000
+    ) -> str:
         """
-        Generates a response using OpenAI model.
+        Generates a response using OpenAI model without blocking the event loop.
         
         Args:
             prompt: User message or prompt
@@ -31,7 +39,7 @@ class LLMService:
             HTTPException: If there's an error communicating with OpenAI
         """
         try:
-            response = self.client.chat.completions.create(
+            response = await self.async_client.chat.completions.create(
                 model=self.model,
                 messages=[
                     {"role": "user", "content": prompt}
@@ -50,6 +58,50 @@ class LLMService:
                 status_code=500,
                 detail=f"Error generating response with OpenAI: {str(e)}"
             )
+    
+    async def generate_response_stream_async(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 1000
+    ) -> AsyncIterator[str]:
+        """
+        Generates a response using OpenAI model, yielding it piece by piece
+        as the model produces it, without blocking the event loop.
+        
+        Args:
+            prompt: User message or prompt
+            temperature: Temperature for generation (0.0-2.0). Default: 0.7
+            max_tokens: Maximum number of tokens in response. Default: 1000
+            
+        Returns:
+            Async iterator over pieces of the generated response
+            
+        Raises:
+            HTTPException: If there's an error communicating with OpenAI
+        """
+        try:
+            stream = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
+            )
+            
+            async for event in stream:
+                if event.choices and event.choices[0].delta.content:
+                    yield event.choices[0].delta.content
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error generating response with OpenAI: {str(e)}"
+            )
 
 
 # Singleton service instance
@@ -0,0 +1,233 @@
+"""
+In-process caches for RAG responses.
+Avoid repeating the embedding call, vector search and LLM generation for
+queries that were already answered, verbatim or with nearly the same meaning.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional
+
+import numpy as np
+
+from config import get_settings
+from core.rag.cache_kernel import int8_dot_scores
+
+settings = get_settings()
+
+
+class ResponseCache:
+    """
+    Bounded LRU cache whose entries expire after a time-to-live.
+    """
+    
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        Initializes the cache.
+        
+        Args:
+            maxsize: Maximum number of entries; least recently used are evicted first
+            ttl: Seconds an entry stays valid
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Gets a cached value.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Cached value, or None if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Stores a value, evicting the least recently used entries if full.
+        
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        if self.maxsize <= 0:
+            return
+        
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Removes all entries."""
+        with self._lock:
+            self._entries.clear()
+
+
+class SemanticCache:
+    """
+    LRU cache looked up by query embedding instead of query text.
+    A cached value is returned when the cosine similarity between its query
+    and the new one reaches the threshold, within the same scope, and its
+    time-to-live has not passed.
+    Embeddings are stored quantized to int8 with one scale per row, a quarter
+    of the memory (and memory bandwidth while scoring) of float32.
+    """
+    
+    def __init__(self, maxsize: int, threshold: float, ttl: float):
+        """
+        Initializes the cache.
+        
+        Args:
+            maxsize: Maximum number of entries; least recently used are evicted first
+            threshold: Minimum cosine similarity for a cache hit
+            ttl: Seconds an entry stays valid
+        """
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # Quantized normalized embeddings, one row per slot (allocated on first insert)
+        self._embeddings: Optional[np.ndarray] = None
+        # Factor that turns each quantized row back into float values
+        self._scales = np.zeros(maxsize, dtype=np.float32)
+        self._scopes: List[Hashable] = [None] * maxsize
+        self._values: List[Any] = [None] * maxsize
+        self._used = np.zeros(maxsize, dtype=bool)
+        self._expires_at = np.zeros(maxsize, dtype=np.float64)  # time.monotonic() deadline of each slot
+        self._lru: OrderedDict[int, None] = OrderedDict()  # Used slots, oldest first
+    
+    def get(self, embedding: List[float], scope: Hashable = None) -> Optional[Any]:
+        """
+        Gets the value of the most similar cached query.
+        
+        Args:
+            embedding: Embedding of the query
+            scope: Only entries stored with the same scope can match (e.g. a document filter)
+            
+        Returns:
+            Cached value, or None if no cached query is similar enough
+        """
+        with self._lock:
+            if not self._lru:
+                return None
+            
+            query, query_scale = _quantize(_normalize(embedding))
+            scores = int8_dot_scores(self._embeddings, query) * (self._scales * query_scale)
+            candidates = (
+                self._used
+                & (self._expires_at >= time.monotonic())
+                & np.array([stored == scope for stored in self._scopes])
+            )
+            scores[~candidates] = -np.inf
+            
+            slot = int(np.argmax(scores))
+            if scores[slot] < self.threshold:
+                return None
+            
+            self._lru.move_to_end(slot)
+            return self._values[slot]
+    
+    def set(self, embedding: List[float], value: Any, scope: Hashable = None) -> None:
+        """
+        Stores a value, evicting the least recently used entry if full.
+        
+        Args:
+            embedding: Embedding of the query
+            value: Value to store
+            scope: Scope the entry belongs to
+        """
+        if self.maxsize <= 0:
+            return
+        
+        with self._lock:
+            vector, scale = _quantize(_normalize(embedding))
+            if self._embeddings is None:
+                self._embeddings = np.zeros((self.maxsize, vector.shape[0]), dtype=np.int8)
+            
+            # Reuse the first free or expired slot, else evict the least recently used
+            free = ~self._used | (self._expires_at < time.monotonic())
+            if free.any():
+                slot = int(np.argmax(free))
+                self._lru.pop(slot, None)
+            else:
+                slot, _ = self._lru.popitem(last=False)
+            
+            self._embeddings[slot] = vector
+            self._scales[slot] = scale
+            self._scopes[slot] = scope
+            self._values[slot] = value
+            self._used[slot] = True
+            self._expires_at[slot] = time.monotonic() + self.ttl
+            self._lru[slot] = None
+    
+    def clear(self) -> None:
+        """Removes all entries."""
+        with self._lock:
+            self._scopes = [None] * self.maxsize
+            self._values = [None] * self.maxsize
+            self._used[:] = False
+            self._lru.clear()
+
+
+def _normalize(embedding: List[float]) -> np.ndarray:
+    """Returns the embedding as a unit-length float32 vector."""
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _quantize(vector: np.ndarray) -> tuple[np.ndarray, np.float32]:
+    """
+    Quantizes a vector to int8 with a symmetric scale.
+    
+    Args:
+        vector: float32 vector
+        
+    Returns:
+        Tuple with (int8 vector, factor that turns it back into float values)
+    """
+    max_abs = float(np.max(np.abs(vector)))
+    if not max_abs:
+        return np.zeros(vector.shape[0], dtype=np.int8), np.float32(0.0)
+    
+    scale = 127.0 / max_abs
+    quantized = np.round(vector * scale).astype(np.int8)
+    return quantized, np.float32(1.0 / scale)
+
+
+def clear_caches() -> None:
+    """Clears all RAG caches, e.g. after new documents are indexed."""
+    response_cache.clear()
+    semantic_cache.clear()
+
+
+# Cache of RAG responses keyed by (query, document_id, n_results)
+response_cache = ResponseCache(
+    maxsize=settings.RAG_CACHE_MAXSIZE,
+    ttl=settings.RAG_CACHE_TTL
+)
+
+# Cache of RAG responses looked up by query similarity, scoped by document_id
+semantic_cache = SemanticCache(
+    maxsize=settings.RAG_SEMANTIC_CACHE_SIZE,
+    threshold=settings.RAG_CACHE_THRESHOLD,
+    ttl=settings.RAG_CACHE_TTL
+)
@@ -0,0 +1,36 @@
+"""
+Similarity kernel for the semantic query cache.
+Uses a parallel Numba kernel when numba is installed and falls back to NumPy.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # Optional, NumPy is used instead
+    njit = None
+
+
+if njit is not None:
+    # Compiled eagerly for C-contiguous inputs, so no request pays the JIT
+    # cost; cache=True reuses the machine code across restarts
+    @njit("i4[::1](i1[:, ::1], i1[::1])", fastmath=True, parallel=True, cache=True)
+    def int8_dot_scores(matrix, query):
+        """
+        Computes the dot product of each int8 row of a matrix with an int8 query,
+        accumulating in int32 so long vectors cannot overflow.
+        """
+        scores = np.empty(matrix.shape[0], dtype=np.int32)
+        for i in prange(matrix.shape[0]):
+            total = np.int32(0)
+            for j in range(matrix.shape[1]):
+                total += np.int32(matrix[i, j]) * np.int32(query[j])
+            scores[i] = total
+        return scores
+else:
+    def int8_dot_scores(matrix: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """
+        Computes the dot product of each int8 row of a matrix with an int8 query,
+        accumulating in int32 so long vectors cannot overflow.
+        """
+        return matrix.astype(np.int32) @ query.astype(np.int32)
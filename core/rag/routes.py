@@ -1,6 +1,5 @@
 from fastapi import APIRouter, Depends
-from fastapi.responses import JSONResponse
-from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse, StreamingResponse
 
 from core.rag.services import RAGService
 from core.rag.schema import RAGQueryRequest, RAGQueryResponse
@@ -9,11 +8,11 @@ from dependencies import get_rag_service
 rag_router = APIRouter()
 
 
-@rag_router.post("/search", response_model=RAGQueryResponse)
+@rag_router.post("/search", response_model=RAGQueryResponse, response_class=ORJSONResponse)
 async def rag_search(
     request: RAGQueryRequest,
     rag_service: RAGService = Depends(get_rag_service)
-) -> JSONResponse:
+) -> ORJSONResponse:
     """
     Endpoint to perform RAG (Retrieval Augmented Generation) search.
     
@@ -28,8 +27,32 @@ async def rag_search(
         JSON response with found chunks and response generated by OpenAI
     """
     # Use service to perform search and generation
-    result = rag_service.search_and_generate(request)
+    result = await rag_service.search_and_generate(request)
     
-    # Return response
-    return JSONResponse(status_code=200, content=jsonable_encoder(result))
+    # Return response (orjson serializes the plain dict much faster than jsonable_encoder)
+    return ORJSONResponse(status_code=200, content=result.model_dump())
 
+
+@rag_router.post("/search/stream")
+async def rag_search_stream(
+    request: RAGQueryRequest,
+    rag_service: RAGService = Depends(get_rag_service)
+) -> StreamingResponse:
+    """
+    Endpoint to perform RAG search streaming the generated response.
+    
+    Works like /search, but sends the found chunks first and then the response
+    as it is generated, as Server-Sent Events.
+    
+    Args:
+        request: Object with query and search parameters
+        rag_service: RAG service injected via dependencies
+        
+    Returns:
+        Event stream with "metadata", "token", "done" and "error" events
+    """
+    return StreamingResponse(
+        rag_service.search_and_generate_stream(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
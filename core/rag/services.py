@@ -3,16 +3,71 @@ RAG (Retrieval Augmented Generation) service for semantic search.
 Uses ChromaDB for vector search and LLM to generate responses.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
+
+import orjson
 from fastapi import HTTPException
 
 from core.vector.service import get_vector_service
 from core.llm.services import llm_service
+from core.rag.cache import response_cache, semantic_cache
 from core.rag.schema import RAGQueryRequest, RAGQueryResponse, ChunkResult
 from config import get_settings
 
 settings = get_settings()
 
+# Hot configuration values, bound once so the search path skips the settings lookups
+_N_RESULTS = settings.RAG_N_RESULTS
+_CACHE_THRESHOLD = settings.RAG_CACHE_THRESHOLD
+_CACHE_TTL = settings.RAG_CACHE_TTL
+_NO_RESULTS_MESSAGE = settings.RAG_NO_RESULTS_MESSAGE
+
+# Header and text of each chunk in the LLM context
+CONTEXT_CHUNK_TEMPLATE = "[Chunk %d - Document %s]:\n%s\n"
+
+# Static start of every prompt, kept first so the provider's prompt caching
+# can reuse it across queries; only the context and question vary
+PROMPT_PREFIX = (
+    "Based on the following information, answer the user's question.\n"
+    "If the information is not sufficient or not related, clearly indicate so.\n"
+    "\n"
+    "Available information:\n"
+)
+PROMPT_SUFFIX_TEMPLATE = "\n\nUser question: %s\n\nAnswer:"
+
+
+def reload_settings() -> None:
+    """
+    Reloads settings from the environment and rebinds the RAG configuration
+    values, including the ones used by the response caches.
+    """
+    global settings, _N_RESULTS, _CACHE_THRESHOLD, _CACHE_TTL, _NO_RESULTS_MESSAGE
+    
+    get_settings.cache_clear()
+    settings = get_settings()
+    _N_RESULTS = settings.RAG_N_RESULTS
+    _CACHE_THRESHOLD = settings.RAG_CACHE_THRESHOLD
+    _CACHE_TTL = settings.RAG_CACHE_TTL
+    _NO_RESULTS_MESSAGE = settings.RAG_NO_RESULTS_MESSAGE
+    
+    semantic_cache.threshold = _CACHE_THRESHOLD
+    response_cache.ttl = _CACHE_TTL
+    semantic_cache.ttl = _CACHE_TTL
+
+
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """
+    Formats a Server-Sent Event.
+    
+    Args:
+        event: Event name
+        data: Event data, sent as JSON
+        
+    Returns:
+        SSE-formatted event
+    """
+    return f"event: {event}\ndata: {orjson.dumps(data).decode()}\n\n"
+
 
 class RAGService:
     """
@@ -23,9 +78,13 @@ class RAGService:
         self.vector_service = get_vector_service()
         self.llm_service = llm_service
     
-    def search_and_generate(self, request: RAGQueryRequest) -> RAGQueryResponse:
+    async def search_and_generate(self, request: RAGQueryRequest) -> RAGQueryResponse:
         """
         Searches for similar chunks and generates a response using the LLM.
+        Responses are cached, so repeating a query (verbatim or with nearly the
+        same meaning) skips search and generation.
+        OpenAI calls use the async client and ChromaDB calls run in a worker
+        thread, so the event loop keeps serving other requests while they wait.
         
         Args:
             request: RAGQueryRequest object with query and parameters
@@ -37,45 +96,43 @@ class RAGService:
             HTTPException: If an error occurs during search or generation
         """
         try:
-            # Filter by document if specified
-            filter_metadata = None
-            if request.document_id:
-                filter_metadata = {"document_id": request.document_id}
+            # Return cached response for an identical query
+            cache_key = (request.query, request.document_id, _N_RESULTS)
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            
+            # Return cached response for a semantically equivalent query
+            query_embedding, cached = await self._get_semantic_cached(request)
+            if cached is not None:
+                return cached
             
             # Search for similar chunks using vector search
-            # n_results comes from configuration, not from user
-            similar_chunks = self.vector_service.search_similar_chunks(
-                query=request.query,
-                n_results=settings.RAG_N_RESULTS,
-                filter_metadata=filter_metadata
-            )
+            similar_chunks = await self._search(request, query_embedding)
             
-            # Build context from found chunks
-            context = self._build_context(similar_chunks)
-            
-            # Generate response using LLM
-            prompt = self._build_prompt(request.query, context)
-            response = self.llm_service.generate_response(prompt)
-            
-            # Format chunks for response
-            chunk_results = [
-                ChunkResult(
-                    chunk_id=chunk.get("chunk_id"),
-                    document_id=chunk.get("document_id"),
-                    text=chunk.get("text", ""),
-                    score=chunk.get("score"),
-                    metadata=chunk.get("metadata", {})
-                )
-                for chunk in similar_chunks
-            ]
-            
-            return RAGQueryResponse(
+            if similar_chunks:
+                # Build context from found chunks
+                context = self._build_context(similar_chunks)
+                
+                # Generate response using LLM
+                prompt = self._build_prompt(request.query, context)
+                response = await self.llm_service.generate_response_async(prompt)
+            else:
+                # Nothing to answer from, so skip the LLM call
+                context = None
+                response = _NO_RESULTS_MESSAGE
+            
+            result = RAGQueryResponse(
                 query=request.query,
                 chunks_found=len(similar_chunks),
-                chunks=chunk_results,
+                chunks=self._format_chunks(similar_chunks),
                 response=response,
-                context_used=context if len(similar_chunks) > 0 else None
+                context_used=context
             )
+            response_cache.set(cache_key, result)
+            semantic_cache.set(query_embedding, result, scope=request.document_id)
+            
+            return result
             
         except HTTPException:
             raise
@@ -85,6 +142,164 @@ class RAGService:
                 detail=f"Error in RAG search: {str(e)}"
             )
     
+    async def search_and_generate_stream(self, request: RAGQueryRequest) -> AsyncIterator[str]:
+        """
+        Searches for similar chunks and streams the LLM response as it is generated,
+        as Server-Sent Events:
+        - "metadata": found chunks, sent before generation starts
+        - "token": a piece of the generated response
+        - "done": generation finished
+        - "error": the search or generation failed
+        Cached responses are sent as a single "token" event.
+        
+        Args:
+            request: RAGQueryRequest object with query and parameters
+            
+        Returns:
+            Async iterator of SSE-formatted events
+        """
+        try:
+            # Send cached response for an identical or semantically equivalent query
+            cache_key = (request.query, request.document_id, _N_RESULTS)
+            cached = response_cache.get(cache_key)
+            query_embedding = None
+            if cached is None:
+                query_embedding, cached = await self._get_semantic_cached(request)
+            
+            if cached is not None:
+                yield _sse_event("metadata", self._stream_metadata(cached.query, cached.chunks))
+                yield _sse_event("token", {"text": cached.response})
+                yield _sse_event("done", {})
+                return
+            
+            # Search for similar chunks and send them before generating
+            similar_chunks = await self._search(request, query_embedding)
+            chunk_results = self._format_chunks(similar_chunks)
+            yield _sse_event("metadata", self._stream_metadata(request.query, chunk_results))
+            
+            if similar_chunks:
+                # Stream response tokens as the LLM generates them
+                context = self._build_context(similar_chunks)
+                prompt = self._build_prompt(request.query, context)
+                response_parts = []
+                async for token in self.llm_service.generate_response_stream_async(prompt):
+                    response_parts.append(token)
+                    yield _sse_event("token", {"text": token})
+                response = "".join(response_parts).strip()
+            else:
+                # Nothing to answer from, so skip the LLM call
+                context = None
+                response = _NO_RESULTS_MESSAGE
+                yield _sse_event("token", {"text": response})
+            
+            result = RAGQueryResponse(
+                query=request.query,
+                chunks_found=len(similar_chunks),
+                chunks=chunk_results,
+                response=response,
+                context_used=context
+            )
+            response_cache.set(cache_key, result)
+            semantic_cache.set(query_embedding, result, scope=request.document_id)
+            
+            yield _sse_event("done", {})
+            
+        except Exception as e:
+            # The response has already started, so errors are sent as an event
+            if isinstance(e, HTTPException):
+                detail = e.detail
+            else:
+                detail = f"Error in RAG search: {str(e)}"
+            yield _sse_event("error", {"detail": detail})
+    
+    async def _get_semantic_cached(
+        self,
+        request: RAGQueryRequest
+    ) -> Tuple[List[float], Optional[RAGQueryResponse]]:
+        """
+        Embeds the query and looks up a cached response for a semantically
+        equivalent query.
+        
+        Args:
+            request: RAGQueryRequest object with query and parameters
+            
+        Returns:
+            Tuple with (query embedding, cached response or None)
+        """
+        query_embedding = await self.vector_service.embed_query_async(request.query)
+        cached = semantic_cache.get(query_embedding, scope=request.document_id)
+        if cached is not None:
+            cached = cached.model_copy(update={"query": request.query})
+        return query_embedding, cached
+    
+    async def _search(
+        self,
+        request: RAGQueryRequest,
+        query_embedding: List[float]
+    ) -> List[Dict[str, Any]]:
+        """
+        Searches for the chunks most similar to the query.
+        
+        Args:
+            request: RAGQueryRequest object with query and parameters
+            query_embedding: Embedding of the query
+            
+        Returns:
+            List of similar chunks
+        """
+        # Filter by document if specified
+        filter_metadata = None
+        if request.document_id:
+            filter_metadata = {"document_id": request.document_id}
+        
+        # n_results comes from configuration, not from user
+        return await self.vector_service.search_similar_chunks_async(
+            query=request.query,
+            n_results=_N_RESULTS,
+            filter_metadata=filter_metadata,
+            query_embedding=query_embedding
+        )
+    
+    def _format_chunks(self, chunks: List[Dict[str, Any]]) -> List[ChunkResult]:
+        """
+        Formats found chunks for the response.
+        Chunks come from our own vector store, so Pydantic validation is skipped.
+        
+        Args:
+            chunks: List of similar chunks
+            
+        Returns:
+            List of ChunkResult
+        """
+        return [
+            ChunkResult.model_construct(
+                chunk_id=chunk.get("chunk_id"),
+                document_id=chunk.get("document_id"),
+                text=chunk.get("text", ""),
+                score=chunk.get("score"),
+                metadata=chunk.get("metadata", {})
+            )
+            for chunk in chunks
+        ]
+    
+    def _stream_metadata(self, query: str, chunks: List[ChunkResult]) -> Dict[str, Any]:
+        """
+        Builds the data of the "metadata" stream event.
+        
+        Args:
+            query: User query
+            chunks: Found chunks
+            
+        Returns:
+            Dictionary with the query, found chunks and their source documents
+        """
+        return {
+            "query": query,
+            "chunks_found": len(chunks),
+            "document_ids": list(dict.fromkeys(chunk.document_id for chunk in chunks)),
+            "chunks": [chunk.model_dump() for chunk in chunks]
+        }
+    
     def _build_context(self, chunks: List[Dict[str, Any]]) -> str:
         """
         Builds context from found chunks.
@@ -95,17 +310,11 @@ class RAGService:
         Returns:
             String with formatted context
         """
-        if not chunks:
-            return "No relevant information found."
-        
-        context_parts = []
-        for i, chunk in enumerate(chunks, 1):
-            context_parts.append(
-                f"[Chunk {i} - Document {chunk.get('document_id', 'N/A')}]:\n"
-                f"{chunk.get('text', '')}\n"
-            )
-        
-        return "\n".join(context_parts)
+        template = CONTEXT_CHUNK_TEMPLATE
+        return "\n".join([
+            template % (i, chunk.get("document_id", "N/A"), chunk.get("text", ""))
+            for i, chunk in enumerate(chunks, 1)
+        ])
     
     def _build_prompt(self, query: str, context: str) -> str:
         """
@@ -118,13 +327,5 @@ class RAGService:
         Returns:
             Formatted prompt for the LLM
         """
-        return f"""Based on the following information, answer the user's question.
-If the information is not sufficient or not related, clearly indicate so.
-
-Available information:
-{context}
-
-User question: {query}
-
-Answer:"""
+        return PROMPT_PREFIX + context + PROMPT_SUFFIX_TEMPLATE % query
 
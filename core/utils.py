@@ -1,6 +1,5 @@
 from fastapi import UploadFile, HTTPException, File
 from typing import Set
-import os
 
 
 def create_file_extension_validator(allowed_extensions: Set[str], error_message: str = None):
@@ -21,6 +20,17 @@ def create_file_extension_validator(allowed_extensions: Set[str], error_message:
         >>> async def upload(file: UploadFile = Depends(validator)):
         >>>     ...
     """
+    allowed_extensions = frozenset(ext.lower() for ext in allowed_extensions)
+    
+    # Built once here instead of on every rejected upload
+    if error_message is None:
+        extensions_str = ", ".join(sorted(allowed_extensions))
+        error_prefix = (
+            f"File type not allowed. "
+            f"Only {extensions_str} files are allowed. "
+            f"Received: "
+        )
+    
     def validate_file_extension(file: UploadFile = File(...)) -> UploadFile:
         """
         Validates that the uploaded file has an allowed extension.
@@ -35,27 +45,20 @@ def create_file_extension_validator(allowed_extensions: Set[str], error_message:
         Raises:
             HTTPException: If file has no name or extension is not allowed
         """
-        if not file.filename:
+        filename = file.filename
+        if not filename:
             raise HTTPException(
                 status_code=400, 
                 detail="File must have a name"
             )
         
-        # Get file extension
-        file_extension = os.path.splitext(file.filename)[1].lower()
+        # Get file extension (a leading dot alone, as in ".env", is not one)
+        dot = filename.rfind(".")
+        file_extension = filename[dot:].lower() if dot > 0 else ""
         
         # Validate extension is allowed
         if file_extension not in allowed_extensions:
-            if error_message:
-                detail = error_message
-            else:
-                extensions_str = ", ".join(sorted(allowed_extensions))
-                detail = (
-                    f"File type not allowed. "
-                    f"Only {extensions_str} files are allowed. "
-                    f"Received: {file_extension}"
-                )
-            
+            detail = error_message or error_prefix + file_extension
             raise HTTPException(status_code=400, detail=detail)
         
         return file
@@ -1,18 +1,92 @@
+import asyncio
 import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 import json
 
 import chromadb
+import numpy as np
 from chromadb.config import Settings as ChromaSettings
-from chromadb.utils import embedding_functions
-from openai import OpenAI
+from openai import AsyncOpenAI
 from fastapi import HTTPException
 
+try:
+    import faiss
+except ImportError:  # Optional, only needed with VECTOR_BACKEND=faiss
+    faiss = None
 
 from config import get_settings
+from core.http import shared_async_http
 
 settings = get_settings()
+MAX_EMBEDDING_INPUTS = 2048  # Maximum inputs accepted per embeddings request
+EMBED_BATCH_SIZE = min(settings.EMBED_BATCH_SIZE, MAX_EMBEDDING_INPUTS)
+EMBED_CONCURRENCY = max(1, settings.EMBED_CONCURRENCY)
+
+QUERY_EMBEDDING_CACHE_SIZE = 4096  # Distinct query texts whose embeddings are kept in memory
+METADATA_TEXT_LENGTH = 100  # Characters of chunk text kept in the metadata preview
+FAISS_FLUSH_INTERVAL = max(1, settings.FAISS_FLUSH_INTERVAL)
+FAISS_FLUSH_EVERY = max(1, settings.FAISS_FLUSH_EVERY)
+
+# OpenAI client shared by every VectorService instance
+async_openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, http_client=shared_async_http)
+
+
+class EmbeddingCache:
+    """
+    Bounded LRU cache of embeddings keyed by (model, text).
+    Plain get/set, since functools.lru_cache cannot memoize coroutines.
+    """
+    
+    def __init__(self, maxsize: int):
+        """
+        Initializes the cache.
+        
+        Args:
+            maxsize: Maximum number of embeddings; least recently used are evicted first
+        """
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple[str, str], tuple[float, ...]] = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        """
+        Gets a cached embedding.
+        
+        Args:
+            model: Embedding model
+            text: Embedded text
+            
+        Returns:
+            Embedding, or None if not cached
+        """
+        with self._lock:
+            embedding = self._entries.get((model, text))
+            if embedding is None:
+                return None
+            self._entries.move_to_end((model, text))
+        return list(embedding)
+    
+    def set(self, model: str, text: str, embedding: List[float]) -> None:
+        """
+        Stores an embedding, evicting the least recently used one if full.
+        
+        Args:
+            model: Embedding model
+            text: Embedded text
+            embedding: Embedding of the text
+        """
+        with self._lock:
+            self._entries[(model, text)] = tuple(embedding)
+            self._entries.move_to_end((model, text))
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+# Embeddings of recent queries, so repeated queries don't call the API again
+query_embedding_cache = EmbeddingCache(maxsize=QUERY_EMBEDDING_CACHE_SIZE)
 
 
 class VectorService:
@@ -30,7 +104,7 @@ class VectorService:
         self.collection_name = collection_name
         self.client = None
         self.collection = None
-        self.openai_client = None
+        self.async_openai_client = None
         self.embedding_model = settings.OPENAI_EMBEDDING_MODEL
         
         self._initialize_clients()
@@ -42,12 +116,6 @@ class VectorService:
             chroma_db_path = settings.CHROMA_DB_PATH
             Path(chroma_db_path).mkdir(parents=True, exist_ok=True)
             
-            # Use OpenAI embedding function
-            embedding_function = embedding_functions.OpenAIEmbeddingFunction(
-                api_key=settings.OPENAI_API_KEY,
-                model_name=self.embedding_model
-            )
-            
             # Initialize ChromaDB client
             self.client = chromadb.PersistentClient(
                 path=chroma_db_path,
@@ -57,15 +125,16 @@ class VectorService:
                 )
             )
             
-            # Get or create collection
+            # Get or create collection. Embeddings are always computed by this
+            # service and passed explicitly, so no embedding function is needed.
             self.collection = self.client.get_or_create_collection(
                 name=self.collection_name,
-                embedding_function=embedding_function,
+                embedding_function=None,
                 metadata={"description": "Document chunks embeddings"}
             )
             
-            # Initialize OpenAI client
-            self.openai_client = OpenAI(api_key=settings.OPENAI_API_KEY)
+            # Use the shared OpenAI client
+            self.async_openai_client = async_openai_client
             
         except Exception as e:
             raise HTTPException(
@@ -73,35 +142,48 @@ class VectorService:
                 detail=f"Error initializing VectorService: {str(e)}"
             )
     
-    async def generate_embedding(self, text: str) -> List[float]:
+    async def embed_query_async(self, query: str) -> List[float]:
         """
-        Generates an embedding for text using OpenAI.
+        Gets the embedding of a search query without blocking the event loop.
+        Embeddings are cached in memory, so repeated queries cost no API call.
         
         Args:
-            text: Text to convert to embedding
+            query: Query text
             
         Returns:
             List of floats representing the embedding
         """
-        try:
-            response = self.openai_client.embeddings.create(
+        embedding = query_embedding_cache.get(self.embedding_model, query)
+        if embedding is None:
+            response = await self.async_openai_client.embeddings.create(
                 model=self.embedding_model,
-                input=text
-            )
-            return response.data[0].embedding
-        except Exception as e:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Error generating embedding: {str(e)}"
+                input=[query]
             )
+            embedding = response.data[0].embedding
+            query_embedding_cache.set(self.embedding_model, query, embedding)
+        return embedding
     
-    def add_chunks(
+    def _batches(self, texts: List[str]) -> List[List[str]]:
+        """
+        Splits texts into batches of EMBED_BATCH_SIZE for the embeddings API.
+        
+        Args:
+            texts: Texts to split
+            
+        Returns:
+            List of batches, in order
+        """
+        return [texts[start:start + EMBED_BATCH_SIZE] for start in range(0, len(texts), EMBED_BATCH_SIZE)]
+    
+    async def add_chunks_async(
         self,
         chunks: List[Dict[str, Any]],
         document_id: int
     ) -> None:
         """
-        Adds multiple chunks to ChromaDB with their embeddings.
+        Adds multiple chunks to ChromaDB with their embeddings, without blocking
+        the event loop. Embedding batches are requested concurrently, up to
+        EMBED_CONCURRENCY at a time.
         
         Args:
             chunks: List of dictionaries with 'id' and 'text' for each chunk
@@ -112,72 +194,126 @@ class VectorService:
                 return
             
             # Prepare data for ChromaDB
-            ids = [f"chunk_{chunk['id']}" for chunk in chunks]
-            texts = [chunk['text'] for chunk in chunks]
-            metadatas = [
-                {
-                    "chunk_id": chunk['id'],
-                    "document_id": document_id,
-                    "text": chunk['text'][:100]  # First 100 characters for metadata
-                }
-                for chunk in chunks
-            ]
-            
-            # Add to ChromaDB (automatically generates embeddings)
-            self.collection.add(
-                ids=ids,
-                documents=texts,
-                metadatas=metadatas
-            )
+            ids, texts, metadatas = self._prepare_chunks(chunks, document_id)
+            
+            # Generate all embeddings in concurrent batched requests
+            embeddings = await self._embed_texts_async(texts)
+            
+            # Add to the vector store with precomputed embeddings
+            await asyncio.to_thread(self._store, ids, texts, metadatas, embeddings)
             
         except Exception as e:
             raise HTTPException(
                 status_code=500,
-                detail=f"Error adding chunks to ChromaDB: {str(e)}"
+                detail=f"Error adding chunks to vector store: {str(e)}"
             )
     
-    def search_similar_chunks(
+    async def _embed_texts_async(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generates embeddings for several texts, sending up to EMBED_CONCURRENCY
+        batched API calls at the same time.
+        
+        Args:
+            texts: Texts to convert to embeddings
+            
+        Returns:
+            List of embeddings in the same order as the texts
+        """
+        semaphore = asyncio.Semaphore(EMBED_CONCURRENCY)
+        
+        async def embed_batch(batch: List[str]) -> List[List[float]]:
+            async with semaphore:
+                response = await self.async_openai_client.embeddings.create(
+                    model=self.embedding_model,
+                    input=batch
+                )
+            return [item.embedding for item in response.data]
+        
+        results = await asyncio.gather(*(embed_batch(batch) for batch in self._batches(texts)))
+        return [embedding for batch_embeddings in results for embedding in batch_embeddings]
+    
+    def _prepare_chunks(
+        self,
+        chunks: List[Dict[str, Any]],
+        document_id: int
+    ) -> tuple[List[str], List[str], List[Dict[str, Any]]]:
+        """
+        Builds the ids, documents and metadatas stored in ChromaDB for some chunks.
+        
+        Args:
+            chunks: List of dictionaries with 'id' and 'text' for each chunk
+            document_id: ID of the document the chunks belong to
+            
+        Returns:
+            Tuple with (ids, texts, metadatas)
+        """
+        # One pass over the chunks, filling preallocated lists
+        count = len(chunks)
+        ids = [None] * count
+        texts = [None] * count
+        metadatas = [None] * count
+        for i, chunk in enumerate(chunks):
+            chunk_id = chunk['id']
+            text = chunk['text']
+            ids[i] = f"chunk_{chunk_id}"
+            texts[i] = text
+            metadatas[i] = {
+                "chunk_id": chunk_id,
+                "document_id": document_id,
+                # First 100 characters for metadata (short texts are stored as is)
+                "text": text if len(text) <= METADATA_TEXT_LENGTH else text[:METADATA_TEXT_LENGTH]
+            }
+        return ids, texts, metadatas
+    
+    def _store(
+        self,
+        ids: List[str],
+        texts: List[str],
+        metadatas: List[Dict[str, Any]],
+        embeddings: List[List[float]]
+    ) -> None:
+        """
+        Writes chunks and their embeddings to ChromaDB.
+        
+        Args:
+            ids: ChromaDB ids of the chunks
+            texts: Chunk texts
+            metadatas: Chunk metadatas
+            embeddings: Chunk embeddings
+        """
+        self.collection.add(
+            ids=ids,
+            documents=texts,
+            metadatas=metadatas,
+            embeddings=embeddings
+        )
+    
+    async def search_similar_chunks_async(
         self,
         query: str,
         n_results: int = 5,
-        filter_metadata: Optional[Dict[str, Any]] = None
+        filter_metadata: Optional[Dict[str, Any]] = None,
+        query_embedding: Optional[List[float]] = None
     ) -> List[Dict[str, Any]]:
         """
-        Searches for similar chunks to a query using vector search.
+        Searches for chunks similar to a query without blocking the event loop.
+        The query is embedded with the async OpenAI client; the vector store,
+        which has no async API, is queried in a worker thread.
         
         Args:
             query: Query text
             n_results: Number of results to return
             filter_metadata: Optional metadata filters (e.g., {"document_id": 1})
+            query_embedding: Embedding of the query, if the caller already has it
             
         Returns:
             List of similar chunks with their metadata and scores
         """
         try:
-            # Perform search in ChromaDB
-            results = self.collection.query(
-                query_texts=[query],
-                n_results=n_results,
-                where=filter_metadata if filter_metadata else None
-            )
+            if query_embedding is None:
+                query_embedding = await self.embed_query_async(query)
             
-            # Format results
-            similar_chunks = []
-            if results['ids'] and len(results['ids'][0]) > 0:
-                for i in range(len(results['ids'][0])):
-                    chunk_id = results['ids'][0][i]
-                    metadata = results['metadatas'][0][i]
-                    distance = results['distances'][0][i] if 'distances' in results else None
-                    
-                    similar_chunks.append({
-                        "chunk_id": metadata.get("chunk_id"),
-                        "document_id": metadata.get("document_id"),
-                        "text": results['documents'][0][i],
-                        "score": 1 - distance if distance else None,  # Convert distance to score
-                        "metadata": metadata
-                    })
-            
-            return similar_chunks
+            return await asyncio.to_thread(self._query, query_embedding, n_results, filter_metadata)
             
         except Exception as e:
             raise HTTPException(
@@ -185,6 +321,51 @@ class VectorService:
                 detail=f"Error searching for similar chunks: {str(e)}"
             )
     
+    def _query(
+        self,
+        query_embedding: List[float],
+        n_results: int,
+        filter_metadata: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Searches ChromaDB for the chunks closest to an embedding.
+        
+        Args:
+            query_embedding: Embedding of the query
+            n_results: Number of results to return
+            filter_metadata: Optional metadata filters
+            
+        Returns:
+            List of similar chunks with their metadata and scores
+        """
+        # Perform search in ChromaDB
+        results = self.collection.query(
+            query_embeddings=[query_embedding],
+            n_results=n_results,
+            where=filter_metadata if filter_metadata else None
+        )
+        
+        # Format results (only one query was sent, so take its row once)
+        if not results['ids'] or not results['ids'][0]:
+            return []
+        
+        metadatas = results['metadatas'][0]
+        documents = results['documents'][0]
+        distances = results['distances'][0] if results.get('distances') else [None] * len(metadatas)
+        
+        similar_chunks = [
+            {
+                "chunk_id": metadata.get("chunk_id"),
+                "document_id": metadata.get("document_id"),
+                "text": text,
+                "score": 1 - distance if distance is not None else None,  # Convert distance to score
+                "metadata": metadata
+            }
+            for metadata, text, distance in zip(metadatas, documents, distances)
+        ]
+        
+        return similar_chunks
+    
     def delete_document_chunks(self, document_id: int) -> None:
         """
         Deletes all chunks of a document from ChromaDB.
@@ -227,15 +408,273 @@ class VectorService:
                 status_code=500,
                 detail=f"Error getting collection information: {str(e)}"
             )
+    
+    def close(self) -> None:
+        """Releases resources held by the service. ChromaDB persists on its own."""
 
 
-# Singleton instance for global use
-_vector_service_instance: Optional[VectorService] = None
+class FaissVectorService(VectorService):
+    """
+    Service to handle embeddings and vector search with an in-process FAISS index.
+    Embeddings are L2-normalized, so inner product search gives cosine similarity.
+    Exact (flat) search is fast for small and medium corpora and avoids ChromaDB's
+    per-operation SQLite writes.
+    
+    Writes only touch memory; a background thread saves a snapshot of the index
+    and chunk data under FAISS_INDEX_PATH every FAISS_FLUSH_INTERVAL seconds, or
+    sooner after FAISS_FLUSH_EVERY changes, and on close(). The snapshot is
+    loaded back when the service is created.
+    """
+    
+    def _initialize_clients(self) -> None:
+        """Initializes the FAISS index and OpenAI client."""
+        if faiss is None:
+            raise HTTPException(
+                status_code=500,
+                detail="Error initializing VectorService: VECTOR_BACKEND=faiss requires the faiss-cpu package"
+            )
+        
+        # Created on first insert, once the embedding dimension is known.
+        # IDs in the index are the chunk IDs.
+        self.index = None
+        # chunk_id -> (text, metadata)
+        self.chunks: Dict[int, tuple[str, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        
+        # Use the shared OpenAI client
+        self.async_openai_client = async_openai_client
+        
+        # Snapshot files and background flushing
+        self.storage_dir = Path(settings.FAISS_INDEX_PATH) / self.collection_name
+        self._snapshot_path = self.storage_dir / "snapshot.npz"
+        self._pending = 0  # Changes not yet written to disk
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        
+        self._load()
+        self._flusher = threading.Thread(
+            target=self._flush_loop,
+            name=f"faiss-flush-{self.collection_name}",
+            daemon=True
+        )
+        self._flusher.start()
+    
+    def _load(self) -> None:
+        """Loads the last saved snapshot of the index and chunk data, if any."""
+        if not self._snapshot_path.exists():
+            return
+        
+        with np.load(self._snapshot_path) as snapshot:
+            self.index = faiss.deserialize_index(snapshot["index"])
+            chunks = json.loads(snapshot["chunks"].tobytes())
+        self.chunks = {
+            chunk_id: (text, metadata)
+            for chunk_id, text, metadata in chunks
+        }
+    
+    def _mark_changed(self, count: int) -> None:
+        """
+        Records unsaved changes and wakes the flusher once enough accumulate.
+        Must be called with self._lock held.
+        """
+        self._pending += count
+        if self._pending >= FAISS_FLUSH_EVERY:
+            self._wake.set()
+    
+    def _flush_loop(self) -> None:
+        """Saves pending changes periodically until the service is closed."""
+        while not self._closed:
+            self._wake.wait(FAISS_FLUSH_INTERVAL)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error saving FAISS index of collection {self.collection_name}: {str(e)}")
+    
+    def flush(self) -> None:
+        """
+        Writes the index and chunk data to disk if there are unsaved changes.
+        The lock is held only while taking an in-memory copy. Index and chunk
+        data are written together to a single file under a temporary name and
+        then renamed, so a crash never leaves a partial or mismatched snapshot.
+        If writing fails, the changes stay pending and are saved by the next flush.
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending = self._pending
+                if not pending or self.index is None:
+                    return
+                index_bytes = faiss.serialize_index(self.index)
+                chunks = [
+                    [chunk_id, text, metadata]
+                    for chunk_id, (text, metadata) in self.chunks.items()
+                ]
+            
+            chunks_bytes = json.dumps(chunks).encode("utf-8")
+            self.storage_dir.mkdir(parents=True, exist_ok=True)
+            snapshot_tmp = self._snapshot_path.with_suffix(".tmp")
+            with open(snapshot_tmp, "wb") as f:
+                np.savez(f, index=index_bytes, chunks=np.frombuffer(chunks_bytes, dtype=np.uint8))
+            os.replace(snapshot_tmp, self._snapshot_path)
+            
+            # Changes made while writing are left for the next flush
+            with self._lock:
+                self._pending -= pending
+    
+    def close(self) -> None:
+        """Stops the background flusher and saves any pending changes."""
+        self._closed = True
+        self._wake.set()
+        self._flusher.join()
+        self.flush()
+    
+    def _store(
+        self,
+        ids: List[str],
+        texts: List[str],
+        metadatas: List[Dict[str, Any]],
+        embeddings: List[List[float]]
+    ) -> None:
+        """
+        Adds chunks and their normalized embeddings to the FAISS index.
+        
+        Args:
+            ids: Vector store ids of the chunks (unused, chunk IDs are taken from metadatas)
+            texts: Chunk texts
+            metadatas: Chunk metadatas
+            embeddings: Chunk embeddings
+        """
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        faiss.normalize_L2(vectors)
+        chunk_ids = np.array([metadata["chunk_id"] for metadata in metadatas], dtype=np.int64)
+        
+        with self._lock:
+            if self.index is None:
+                self.index = faiss.IndexIDMap2(faiss.IndexFlatIP(vectors.shape[1]))
+            self.index.add_with_ids(vectors, chunk_ids)
+            for chunk_id, text, metadata in zip(chunk_ids.tolist(), texts, metadatas):
+                self.chunks[chunk_id] = (text, metadata)
+            self._mark_changed(len(texts))
+    
+    def _query(
+        self,
+        query_embedding: List[float],
+        n_results: int,
+        filter_metadata: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Searches the FAISS index for the chunks most similar to an embedding.
+        
+        Args:
+            query_embedding: Embedding of the query
+            n_results: Number of results to return
+            filter_metadata: Optional metadata filters
+            
+        Returns:
+            List of similar chunks with their metadata and scores
+        """
+        query_vector = np.asarray([query_embedding], dtype=np.float32)
+        faiss.normalize_L2(query_vector)
+        
+        with self._lock:
+            if self.index is None or self.index.ntotal == 0:
+                return []
+            
+            # Restrict the search to chunks matching the filter
+            params = None
+            if filter_metadata:
+                allowed_ids = [
+                    chunk_id
+                    for chunk_id, (_, metadata) in self.chunks.items()
+                    if all(metadata.get(key) == value for key, value in filter_metadata.items())
+                ]
+                if not allowed_ids:
+                    return []
+                selector = faiss.IDSelectorBatch(np.array(allowed_ids, dtype=np.int64))
+                params = faiss.SearchParameters(sel=selector)
+            
+            scores, chunk_ids = self.index.search(
+                query_vector,
+                min(n_results, self.index.ntotal),
+                params=params
+            )
+            
+            similar_chunks = []
+            for score, chunk_id in zip(scores[0].tolist(), chunk_ids[0].tolist()):
+                entry = self.chunks.get(chunk_id)
+                if entry is None:  # Fewer matches than requested (-1), or no chunk data
+                    continue
+                text, metadata = entry
+                similar_chunks.append({
+                    "chunk_id": metadata.get("chunk_id"),
+                    "document_id": metadata.get("document_id"),
+                    "text": text,
+                    "score": score,  # Cosine similarity
+                    "metadata": metadata
+                })
+        
+        return similar_chunks
+    
+    def delete_document_chunks(self, document_id: int) -> None:
+        """
+        Deletes all chunks of a document from the FAISS index.
+        
+        Args:
+            document_id: ID of the document whose chunks will be deleted
+        """
+        try:
+            with self._lock:
+                chunk_ids = [
+                    chunk_id
+                    for chunk_id, (_, metadata) in self.chunks.items()
+                    if metadata.get("document_id") == document_id
+                ]
+                if not chunk_ids:
+                    return
+                
+                self.index.remove_ids(np.array(chunk_ids, dtype=np.int64))
+                for chunk_id in chunk_ids:
+                    del self.chunks[chunk_id]
+                self._mark_changed(len(chunk_ids))
+                
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error deleting document chunks: {str(e)}"
+            )
+    
+    def get_collection_info(self) -> Dict[str, Any]:
+        """
+        Gets information about the current collection.
+        
+        Returns:
+            Dictionary with collection information
+        """
+        return {
+            "collection_name": self.collection_name,
+            "total_chunks": self.index.ntotal if self.index is not None else 0,
+            "embedding_model": self.embedding_model
+        }
+
+
+# Vector service implementation for each VECTOR_BACKEND value
+VECTOR_BACKENDS = {
+    "chroma": VectorService,
+    "faiss": FaissVectorService,
+}
+
+
+# One vector service per collection, shared for the life of the process
+_instances: Dict[str, VectorService] = {}
+_instances_lock = threading.Lock()
 
 
 def get_vector_service(collection_name: str = "documents") -> VectorService:
     """
-    Gets an instance of the vector service (singleton pattern).
+    Gets the vector service of a collection, using the backend set in VECTOR_BACKEND.
+    One instance is created per collection and reused for the life of the process,
+    so the ChromaDB and OpenAI clients are only initialized once.
     
     Args:
         collection_name: Collection name to use
@@ -243,10 +682,29 @@ def get_vector_service(collection_name: str = "documents") -> VectorService:
     Returns:
         VectorService instance
     """
-    global _vector_service_instance
+    service = _instances.get(collection_name)
+    if service is not None:
+        return service
     
-    if _vector_service_instance is None or _vector_service_instance.collection_name != collection_name:
-        _vector_service_instance = VectorService(collection_name=collection_name)
+    # Only the first request for a collection takes the lock, so concurrent
+    # requests cannot build (and open the store) twice
+    with _instances_lock:
+        service = _instances.get(collection_name)
+        if service is None:
+            service_class = VECTOR_BACKENDS.get(settings.VECTOR_BACKEND)
+            if service_class is None:
+                raise ValueError(f"Unsupported VECTOR_BACKEND: {settings.VECTOR_BACKEND}")
+            service = service_class(collection_name=collection_name)
+            _instances[collection_name] = service
     
-    return _vector_service_instance
+    return service
 
+
+def close_vector_services() -> None:
+    """Closes every vector service, saving pending changes. Called on shutdown."""
+    with _instances_lock:
+        services = list(_instances.values())
+        _instances.clear()
+    
+    for service in services:
+        service.close()
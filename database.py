@@ -8,6 +8,8 @@ settings = get_settings()
 DB_URL = f'postgresql://{settings.DB_USERNAME}:{settings.DB_PASSWORD}@{settings.DB_HOST}:5432/{settings.DB_NAME}'
 engine = create_engine(DB_URL)
 
-sessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Objects keep their loaded values after commit, so reading them back
+# (e.g. a new document's id) doesn't issue another SELECT
+sessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 Base = declarative_base()
\ No newline at end of file
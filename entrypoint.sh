@@ -1,4 +1,5 @@
 #!/bin/sh
+set -e
 
 alembic upgrade head
 python  /app/app.py
\ No newline at end of file
@@ -0,0 +1,14 @@
+import os
+import sys
+from pathlib import Path
+
+# Make the project modules importable when pytest runs from any directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Required settings, so tests run without a .env file
+os.environ.setdefault("DB_NAME", "rag-search-api")
+os.environ.setdefault("DB_USERNAME", "test")
+os.environ.setdefault("DB_PASSWORD", "test")
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("OPENAI_API_KEY", "test")
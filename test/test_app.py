@@ -0,0 +1,9 @@
+def test_app_imports():
+    # Importing the app loads every router, service and model module, so
+    # errors raised at import time (e.g. undefined names) fail here
+    from app import app
+    
+    paths = {route.path for route in app.routes}
+    assert "/api/v1/documents/upload" in paths
+    assert "/api/v1/rag/search" in paths
+    assert "/api/v1/rag/search/stream" in paths
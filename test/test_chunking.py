@@ -0,0 +1,49 @@
+import pytest
+
+from core.documents.chunking import split_text
+
+WORDS = " ".join(f"word{i}" for i in range(400))
+
+
+def test_chunks_do_not_exceed_chunk_size():
+    spans = split_text(WORDS, chunk_size=100, chunk_overlap=20)
+    
+    assert len(spans) > 1
+    assert all(0 < end - start <= 100 for start, end in spans)
+    assert spans[0][0] == 0
+    assert spans[-1][1] == len(WORDS)
+
+
+def test_consecutive_chunks_overlap():
+    spans = split_text(WORDS, chunk_size=100, chunk_overlap=20)
+    
+    for (_, previous_end), (start, _) in zip(spans, spans[1:]):
+        assert previous_end - 20 <= start < previous_end
+        # The overlap starts on a word boundary
+        assert WORDS[start - 1] == " "
+
+
+def test_chunks_break_on_preferred_separator():
+    first = "a" * 40 + ". " + "b" * 20
+    text = first + "\n\n" + "c" * 60
+    
+    spans = split_text(text, chunk_size=100, chunk_overlap=10)
+    
+    # The paragraph break wins over the earlier sentence break
+    assert text[slice(*spans[0])] == first + "\n\n"
+
+
+def test_text_without_separators_is_cut_at_chunk_size():
+    spans = split_text("x" * 250, chunk_size=100, chunk_overlap=20)
+    
+    assert spans == [(0, 100), (80, 180), (160, 250)]
+
+
+@pytest.mark.parametrize("text", ["", "   ", "\n\n\t\n"])
+def test_empty_or_whitespace_text_has_no_chunks(text):
+    assert split_text(text, chunk_size=100, chunk_overlap=20) == []
+
+
+def test_overlap_must_be_less_than_half_of_chunk_size():
+    with pytest.raises(ValueError):
+        split_text(WORDS, chunk_size=100, chunk_overlap=50)
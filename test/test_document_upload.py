@@ -0,0 +1,150 @@
+import asyncio
+import datetime
+import hashlib
+from io import BytesIO
+from types import SimpleNamespace
+
+import pytest
+from fastapi import BackgroundTasks, HTTPException, UploadFile
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from core.documents.models import Chunk, Document, EMBEDDING_COMPLETED, EMBEDDING_FAILED, EMBEDDING_PENDING
+from core.documents import services
+from core.documents.services import DocumentService
+from database import Base
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, expire_on_commit=False)()
+    yield session
+    session.close()
+
+
+def add_document(db, status, queued_seconds_ago=0):
+    queued_at = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=queued_seconds_ago)
+    document = Document(
+        filename="doc.txt",
+        content="ab",
+        content_hash="h" * 64,
+        embedding_status=status,
+        embedding_queued_at=queued_at
+    )
+    db.add(document)
+    db.flush()
+    db.add_all([
+        Chunk(document_id=document.id, text="a", start_offset=0, end_offset=1),
+        Chunk(document_id=document.id, text="b", start_offset=1, end_offset=2),
+    ])
+    db.commit()
+    return document
+
+
+def test_duplicate_of_failed_document_retries_embedding(db):
+    document = add_document(db, EMBEDDING_FAILED)
+    service = DocumentService(db)
+    background_tasks = BackgroundTasks()
+    
+    result = service._handle_duplicate(document, background_tasks)
+    
+    assert result["duplicate"] is True
+    assert result["embedding_status"] == EMBEDDING_PENDING
+    assert len(background_tasks.tasks) == 1
+    task = background_tasks.tasks[0]
+    assert task.args == (document.id, [{"id": 1, "text": "a"}, {"id": 2, "text": "b"}])
+    db.expire_all()
+    assert db.get(Document, document.id).embedding_status == EMBEDDING_PENDING
+
+
+def test_concurrent_duplicates_of_failed_document_retry_once(db):
+    document = add_document(db, EMBEDDING_FAILED)
+    service = DocumentService(db)
+    background_tasks = BackgroundTasks()
+    
+    # Both uploads loaded the document before either rescheduled it
+    stale_copy = SimpleNamespace(id=document.id, filename=document.filename, embedding_status=EMBEDDING_FAILED)
+    service._handle_duplicate(document, background_tasks)
+    service._handle_duplicate(stale_copy, background_tasks)
+    
+    assert len(background_tasks.tasks) == 1
+
+
+def test_duplicate_of_completed_document_is_not_processed(db):
+    document = add_document(db, EMBEDDING_COMPLETED)
+    background_tasks = BackgroundTasks()
+    
+    result = DocumentService(db)._handle_duplicate(document, background_tasks)
+    
+    assert result["embedding_status"] == EMBEDDING_COMPLETED
+    assert result["chunks"] == 2
+    assert background_tasks.tasks == []
+
+
+def test_duplicate_of_lost_pending_document_retries_embedding(db):
+    document = add_document(db, EMBEDDING_PENDING, queued_seconds_ago=services.EMBEDDING_RETRY_AFTER + 1)
+    background_tasks = BackgroundTasks()
+    
+    result = DocumentService(db)._handle_duplicate(document, background_tasks)
+    
+    assert result["embedding_status"] == EMBEDDING_PENDING
+    assert len(background_tasks.tasks) == 1
+
+
+def test_duplicate_of_recent_pending_document_is_not_processed(db):
+    document = add_document(db, EMBEDDING_PENDING)
+    background_tasks = BackgroundTasks()
+    
+    DocumentService(db)._handle_duplicate(document, background_tasks)
+    
+    assert background_tasks.tasks == []
+
+
+def test_concurrent_upload_of_same_content_returns_duplicate(db, tmp_path, monkeypatch):
+    content = b"same content"
+    document = add_document(db, EMBEDDING_COMPLETED)
+    document.content_hash = hashlib.sha256(content).hexdigest()
+    db.commit()
+    monkeypatch.setattr(services, "UPLOAD_DIR", tmp_path)
+    (tmp_path / "doc.txt").write_bytes(content)  # Saved by the upload that won
+    
+    service = DocumentService(db)
+    # The hash check ran before the other upload committed
+    lookup = service._get_document_by_hash
+    calls = []
+    
+    def racing_lookup(content_hash):
+        calls.append(content_hash)
+        return None if len(calls) == 1 else lookup(content_hash)
+    
+    monkeypatch.setattr(service, "_get_document_by_hash", racing_lookup)
+    upload = UploadFile(file=BytesIO(content), filename="doc.txt")
+    
+    result = asyncio.run(service.upload_document(upload, BackgroundTasks()))
+    
+    assert result["duplicate"] is True
+    assert result["document_id"] == document.id
+    assert [path.name for path in tmp_path.iterdir()] == ["doc.txt"]
+
+
+def test_failed_move_removes_document(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(services, "UPLOAD_DIR", tmp_path)
+    
+    def failing_replace(src, dst):
+        raise OSError("disk full")
+    
+    monkeypatch.setattr(services.os, "replace", failing_replace)
+    upload = UploadFile(file=BytesIO(b"some text"), filename="doc.txt")
+    background_tasks = BackgroundTasks()
+    
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(DocumentService(db).upload_document(upload, background_tasks))
+    
+    # The content can be uploaded again instead of matching a document without a file
+    assert exc_info.value.status_code == 500
+    assert db.query(Document).count() == 0
+    assert db.query(Chunk).count() == 0
+    assert background_tasks.tasks == []
+    assert list(tmp_path.iterdir()) == []
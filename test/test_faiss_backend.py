@@ -0,0 +1,139 @@
+import pytest
+
+pytest.importorskip("faiss")
+
+from core.vector import service as vector_service
+from core.vector.service import FaissVectorService
+
+
+def chunk_metadata(chunk_id, document_id):
+    return {"chunk_id": chunk_id, "document_id": document_id, "chunk_index": 0}
+
+
+@pytest.fixture
+def index_path(monkeypatch, tmp_path):
+    monkeypatch.setattr(vector_service.settings, "FAISS_INDEX_PATH", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def faiss_service(index_path):
+    service = FaissVectorService(collection_name="test")
+    yield service
+    service.close()
+
+
+def store(service, chunks):
+    service._store(
+        ids=[f"chunk_{chunk_id}" for chunk_id, _, _, _ in chunks],
+        texts=[text for _, _, text, _ in chunks],
+        metadatas=[chunk_metadata(chunk_id, document_id) for chunk_id, document_id, _, _ in chunks],
+        embeddings=[embedding for _, _, _, embedding in chunks]
+    )
+
+
+CHUNKS = [
+    (1, 10, "alpha", [1.0, 0.0, 0.0]),
+    (2, 10, "beta", [0.0, 1.0, 0.0]),
+    (3, 20, "gamma", [0.9, 0.1, 0.0]),
+]
+
+
+def test_query_returns_most_similar_chunks(faiss_service):
+    store(faiss_service, CHUNKS)
+    
+    results = faiss_service._query([2.0, 0.0, 0.0], n_results=2, filter_metadata=None)
+    
+    assert [result["chunk_id"] for result in results] == [1, 3]
+    assert results[0]["text"] == "alpha"
+    assert results[0]["document_id"] == 10
+    assert results[0]["score"] == pytest.approx(1.0)
+
+
+def test_query_applies_metadata_filter(faiss_service):
+    store(faiss_service, CHUNKS)
+    
+    results = faiss_service._query([1.0, 0.0, 0.0], n_results=5, filter_metadata={"document_id": 10})
+    
+    assert [result["chunk_id"] for result in results] == [1, 2]
+    assert faiss_service._query([1.0, 0.0, 0.0], 5, {"document_id": 99}) == []
+
+
+def test_query_on_empty_index(faiss_service):
+    assert faiss_service._query([1.0, 0.0, 0.0], n_results=5, filter_metadata=None) == []
+    assert faiss_service.get_collection_info()["total_chunks"] == 0
+
+
+def test_delete_document_chunks(faiss_service):
+    store(faiss_service, CHUNKS)
+    
+    faiss_service.delete_document_chunks(10)
+    
+    results = faiss_service._query([1.0, 0.0, 0.0], n_results=5, filter_metadata=None)
+    assert [result["chunk_id"] for result in results] == [3]
+    assert faiss_service.get_collection_info()["total_chunks"] == 1
+
+
+def test_flushed_index_is_reloaded(index_path):
+    service = FaissVectorService(collection_name="test")
+    store(service, CHUNKS)
+    service.delete_document_chunks(20)
+    service.flush()
+    service.close()
+    
+    assert (index_path / "test" / "snapshot.npz").exists()
+    
+    reloaded = FaissVectorService(collection_name="test")
+    try:
+        results = reloaded._query([0.0, 1.0, 0.0], n_results=5, filter_metadata=None)
+        assert [result["chunk_id"] for result in results] == [2, 1]
+        assert results[0]["text"] == "beta"
+        assert reloaded.get_collection_info()["total_chunks"] == 2
+    finally:
+        reloaded.close()
+
+
+def test_close_saves_pending_changes(index_path):
+    service = FaissVectorService(collection_name="test")
+    store(service, CHUNKS[:1])
+    service.close()
+    
+    reloaded = FaissVectorService(collection_name="test")
+    try:
+        assert reloaded.get_collection_info()["total_chunks"] == 1
+    finally:
+        reloaded.close()
+
+
+def test_failed_flush_keeps_changes_pending(faiss_service, monkeypatch):
+    store(faiss_service, CHUNKS)
+    
+    replace = vector_service.os.replace
+    calls = []
+    
+    def failing_replace(src, dst):
+        calls.append(dst)
+        if len(calls) == 1:
+            raise OSError("disk full")
+        replace(src, dst)
+    
+    monkeypatch.setattr(vector_service.os, "replace", failing_replace)
+    with pytest.raises(OSError):
+        faiss_service.flush()
+    
+    # The next flush writes the changes that were not saved
+    faiss_service.flush()
+    reloaded = FaissVectorService(collection_name="test")
+    try:
+        assert reloaded.get_collection_info()["total_chunks"] == 3
+    finally:
+        reloaded.close()
+
+
+def test_query_skips_ids_without_chunk_data(faiss_service):
+    store(faiss_service, CHUNKS)
+    del faiss_service.chunks[1]
+    
+    results = faiss_service._query([1.0, 0.0, 0.0], n_results=2, filter_metadata=None)
+    
+    assert [result["chunk_id"] for result in results] == [3]
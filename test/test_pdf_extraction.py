@@ -0,0 +1,77 @@
+import pytest
+from fastapi import HTTPException
+from pypdf import PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+from core.documents.services import DocumentService
+
+
+class PageStub:
+    """Page whose content stream is the given bytes."""
+    
+    def __init__(self, contents):
+        self.contents = DecodedStreamObject()
+        self.contents.set_data(contents)
+    
+    def get_contents(self):
+        return self.contents
+
+
+def write_pdf(path, page_contents):
+    """Writes a PDF with one page per content stream, using Helvetica as /F1."""
+    writer = PdfWriter()
+    font = writer._add_object(DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    }))
+    for contents in page_contents:
+        page = writer.add_blank_page(300, 300)
+        page[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})
+        })
+        stream = DecodedStreamObject()
+        stream.set_data(contents)
+        page[NameObject("/Contents")] = writer._add_object(stream)
+    with open(path, "wb") as f:
+        writer.write(f)
+
+
+def test_extract_pdf_text_from_all_pages(tmp_path):
+    path = tmp_path / "doc.pdf"
+    write_pdf(path, [
+        b"BT /F1 12 Tf 20 200 Td (First page) Tj ET",
+        b"BT /F1 12 Tf 20 200 Td [(Second) -250 (page)] TJ ET",
+    ])
+    
+    text = DocumentService()._extract_pdf_sync(str(path))
+    
+    assert "First page" in text
+    assert "Second" in text
+    assert text.index("First") < text.index("Second")
+
+
+def test_extract_pdf_without_text_is_rejected(tmp_path):
+    path = tmp_path / "drawing.pdf"
+    write_pdf(path, [b"0 0 m 100 100 l S"])
+    
+    with pytest.raises(HTTPException) as exc_info:
+        DocumentService()._extract_pdf_sync(str(path))
+    
+    assert exc_info.value.status_code == 400
+
+
+@pytest.mark.parametrize("contents, expected", [
+    (b"BT /F1 12 Tf (Hello) Tj ET", True),
+    (b"BT [(Hel) 20 (lo)] TJ ET", True),
+    (b"BT (Next line) ' ET", True),
+    (b"BT 1 2 <48656C6C6F> \"\nET", True),
+    (b"q /Im1 Do Q", True),
+    (b"0 0 m 100 100 l S", False),
+    (b"BI /W 2 /H 1 /BPC 8 /CS /G ID \x27\x22 EI", False),
+    (b"0 0 m 100 100 l S % it's a drawing", False),
+])
+def test_text_operator_detection(contents, expected):
+    page = PageStub(contents)
+    
+    assert DocumentService()._page_may_contain_text(page) is expected
@@ -0,0 +1,121 @@
+import numpy as np
+import pytest
+
+from core.rag import cache
+from core.rag.cache import ResponseCache, SemanticCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache.time, "monotonic", fake)
+    return fake
+
+
+def test_response_cache_evicts_least_recently_used(clock):
+    responses = ResponseCache(maxsize=2, ttl=10)
+    responses.set("a", 1)
+    responses.set("b", 2)
+    
+    # Reading "a" makes "b" the least recently used entry
+    assert responses.get("a") == 1
+    responses.set("c", 3)
+    
+    assert responses.get("b") is None
+    assert responses.get("a") == 1
+    assert responses.get("c") == 3
+
+
+def test_response_cache_entries_expire(clock):
+    responses = ResponseCache(maxsize=2, ttl=10)
+    responses.set("a", 1)
+    
+    clock.now += 10
+    assert responses.get("a") == 1
+    
+    clock.now += 1
+    assert responses.get("a") is None
+
+
+def test_response_cache_disabled_with_zero_size(clock):
+    responses = ResponseCache(maxsize=0, ttl=10)
+    responses.set("a", 1)
+    
+    assert responses.get("a") is None
+
+
+def test_semantic_cache_entries_expire(clock):
+    semantic = SemanticCache(maxsize=2, threshold=0.97, ttl=10)
+    semantic.set([1.0, 0.0, 0.0], "answer")
+    
+    clock.now += 9
+    assert semantic.get([1.0, 0.0, 0.0]) == "answer"
+    
+    clock.now += 2
+    assert semantic.get([1.0, 0.0, 0.0]) is None
+
+
+def test_semantic_cache_reuses_expired_slots(clock):
+    semantic = SemanticCache(maxsize=2, threshold=0.97, ttl=10)
+    semantic.set([1.0, 0.0, 0.0], "old")
+    clock.now += 5
+    semantic.set([0.0, 1.0, 0.0], "recent")
+    
+    # The first entry expired, so its slot is reused instead of evicting "recent"
+    clock.now += 6
+    semantic.set([0.0, 0.0, 1.0], "new")
+    
+    assert semantic.get([0.0, 1.0, 0.0]) == "recent"
+    assert semantic.get([0.0, 0.0, 1.0]) == "new"
+    assert semantic.get([1.0, 0.0, 0.0]) is None
+
+
+def test_semantic_cache_matches_similar_embeddings(clock):
+    semantic = SemanticCache(maxsize=2, threshold=0.97, ttl=10)
+    semantic.set([1.0, 0.0, 0.0], "answer")
+    
+    # Scale does not matter, and int8 rounding stays above the threshold
+    assert semantic.get([2.0, 0.01, 0.0]) == "answer"
+    assert semantic.get([0.7, 0.7, 0.0]) is None
+
+
+def test_semantic_cache_quantization_keeps_similarity(clock):
+    rng = np.random.default_rng(0)
+    embedding = rng.standard_normal(1536)
+    semantic = SemanticCache(maxsize=2, threshold=0.97, ttl=10)
+    semantic.set(embedding.tolist(), "answer")
+    
+    # Nearly the same query still matches after int8 rounding; an unrelated one does not
+    close = embedding + rng.standard_normal(1536) * 0.1
+    assert semantic.get(close.tolist()) == "answer"
+    assert semantic.get(rng.standard_normal(1536).tolist()) is None
+
+
+def test_semantic_cache_separates_scopes(clock):
+    semantic = SemanticCache(maxsize=2, threshold=0.97, ttl=10)
+    semantic.set([1.0, 0.0, 0.0], "answer", scope=("top_k", 5))
+    
+    assert semantic.get([1.0, 0.0, 0.0], scope=("top_k", 5)) == "answer"
+    assert semantic.get([1.0, 0.0, 0.0], scope=("top_k", 3)) is None
+
+
+def test_semantic_cache_evicts_least_recently_used(clock):
+    semantic = SemanticCache(maxsize=2, threshold=0.97, ttl=10)
+    semantic.set([1.0, 0.0, 0.0], "first")
+    semantic.set([0.0, 1.0, 0.0], "second")
+    
+    # Reading "first" makes "second" the least recently used entry
+    assert semantic.get([1.0, 0.0, 0.0]) == "first"
+    semantic.set([0.0, 0.0, 1.0], "third")
+    
+    assert semantic.get([0.0, 1.0, 0.0]) is None
+    assert semantic.get([1.0, 0.0, 0.0]) == "first"
+    assert semantic.get([0.0, 0.0, 1.0]) == "third"
@@ -0,0 +1,167 @@
+import asyncio
+
+import orjson
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from core.rag import services
+from core.rag.cache import clear_caches, response_cache, semantic_cache
+from core.rag.schema import RAGQueryRequest
+from core.rag.services import RAGService
+
+CHUNKS = [
+    {"chunk_id": 1, "document_id": 7, "text": "first", "score": 0.9, "metadata": {}},
+    {"chunk_id": 2, "document_id": 8, "text": "second", "score": 0.8, "metadata": {}},
+]
+QUERY_EMBEDDING = [1.0, 0.0, 0.0]
+
+
+class FakeVectorService:
+    def __init__(self, chunks):
+        self.chunks = chunks
+    
+    async def embed_query_async(self, query):
+        return QUERY_EMBEDDING
+    
+    async def search_similar_chunks_async(self, **kwargs):
+        return self.chunks
+
+
+class FakeLLMService:
+    def __init__(self, tokens=("generated",), fail_after=None):
+        self.tokens = tokens
+        self.fail_after = fail_after
+        self.prompts = []
+    
+    async def generate_response_async(self, prompt):
+        self.prompts.append(prompt)
+        return "".join(self.tokens)
+    
+    async def generate_response_stream_async(self, prompt):
+        self.prompts.append(prompt)
+        for i, token in enumerate(self.tokens):
+            if i == self.fail_after:
+                raise HTTPException(status_code=500, detail="LLM unavailable")
+            yield token
+
+
+def make_service(chunks, llm_service=None):
+    # Skip __init__, which would open the real vector store
+    service = RAGService.__new__(RAGService)
+    service.vector_service = FakeVectorService(chunks)
+    service.llm_service = llm_service or FakeLLMService()
+    return service
+
+
+def parse_events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        event_line, data_line = block.split("\n")
+        events.append((event_line[len("event: "):], orjson.loads(data_line[len("data: "):])))
+    return events
+
+
+def stream(service, query):
+    async def collect():
+        request = RAGQueryRequest(query=query)
+        return "".join([event async for event in service.search_and_generate_stream(request)])
+    
+    return parse_events(asyncio.run(collect()))
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    clear_caches()
+    yield
+    clear_caches()
+
+
+def test_no_matching_chunks_skips_llm():
+    service = make_service([])
+    
+    result = asyncio.run(service.search_and_generate(RAGQueryRequest(query="anything")))
+    
+    assert result.response == services._NO_RESULTS_MESSAGE
+    assert result.chunks_found == 0
+    assert result.context_used is None
+    assert service.llm_service.prompts == []
+
+
+def test_matching_chunks_are_sent_to_llm():
+    service = make_service(CHUNKS)
+    
+    result = asyncio.run(service.search_and_generate(RAGQueryRequest(query="question")))
+    
+    assert result.response == "generated"
+    assert result.chunks_found == 2
+    assert result.context_used == "[Chunk 1 - Document 7]:\nfirst\n\n[Chunk 2 - Document 8]:\nsecond\n"
+    assert result.context_used in service.llm_service.prompts[0]
+    assert "User question: question" in service.llm_service.prompts[0]
+
+
+def test_stream_sends_metadata_tokens_and_done_in_order():
+    service = make_service(CHUNKS, FakeLLMService(tokens=("Hel", "lo")))
+    
+    events = stream(service, "question")
+    
+    assert [name for name, _ in events] == ["metadata", "token", "token", "done"]
+    metadata = events[0][1]
+    assert metadata["query"] == "question"
+    assert metadata["chunks_found"] == 2
+    assert metadata["document_ids"] == [7, 8]
+    assert [data["text"] for _, data in events[1:3]] == ["Hel", "lo"]
+    
+    cached = response_cache.get(("question", None, services._N_RESULTS))
+    assert cached.response == "Hello"
+    assert cached.chunks_found == 2
+
+
+def test_stream_without_matching_chunks_skips_llm():
+    service = make_service([])
+    
+    events = stream(service, "anything")
+    
+    assert [name for name, _ in events] == ["metadata", "token", "done"]
+    assert events[1][1] == {"text": services._NO_RESULTS_MESSAGE}
+    assert service.llm_service.prompts == []
+
+
+def test_stream_sends_cached_response_as_single_token():
+    llm_service = FakeLLMService(tokens=("Hel", "lo"))
+    service = make_service(CHUNKS, llm_service)
+    stream(service, "question")
+    
+    events = stream(service, "question")
+    
+    assert [name for name, _ in events] == ["metadata", "token", "done"]
+    assert events[0][1]["chunks_found"] == 2
+    assert events[1][1] == {"text": "Hello"}
+    assert len(llm_service.prompts) == 1
+
+
+def test_stream_sends_error_event_and_does_not_cache_partial_response():
+    service = make_service(CHUNKS, FakeLLMService(tokens=("Hel", "lo"), fail_after=1))
+    
+    events = stream(service, "question")
+    
+    assert [name for name, _ in events] == ["metadata", "token", "error"]
+    assert events[2][1] == {"detail": "LLM unavailable"}
+    assert response_cache.get(("question", None, services._N_RESULTS)) is None
+    assert semantic_cache.get(QUERY_EMBEDDING) is None
+
+
+def test_stream_endpoint_returns_event_stream():
+    from app import app
+    from dependencies import get_rag_service
+    
+    service = make_service(CHUNKS, FakeLLMService(tokens=("Hel", "lo")))
+    app.dependency_overrides[get_rag_service] = lambda: service
+    try:
+        response = TestClient(app).post("/api/v1/rag/search/stream", json={"query": "question"})
+    finally:
+        app.dependency_overrides.clear()
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert [name for name, _ in parse_events(response.text)] == ["metadata", "token", "token", "done"]